@@ -0,0 +1,209 @@
+"""Extraction specs against the hand-written BeautifulSoup paths.
+
+Usage: python benchmarks/extraction.py [--peps N] [--versions N] [--repeat N]
+
+Every kind of page from pages.py is extracted three ways: by the
+find/select chains the modes used before src/specs.py, on a tree cut down
+with a SoupStrainer; by the spec on the same BeautifulSoup tree; and by the
+spec on a full lxml tree. The best of --repeat runs is printed in ms per
+page, with and without building the tree, and written to
+benchmarks/results/extraction_<datetime>_<commit>.json. The three ways must
+extract the same fields, otherwise the report says so.
+"""
+import argparse
+import datetime as dt
+import json
+import platform
+import re
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup, SoupStrainer
+from lxml.html import document_fromstring
+
+from run import DATETIME_FORMAT, RESULTS_DIR, current_commit
+from pages import (MAIN_DOC_URL, PEP_URL, WHATS_NEW_URL, build_pages,
+                   whats_new_versions)
+import specs
+from utils import find_tag
+
+ROW = '{:<20}{:<14}{:>12}{:>14}{:>8}'
+VERSION_PATTERN = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+
+
+def hand_written_pep_index(soup):
+    rows = find_tag(find_tag(soup, id='numerical-index'), 'tbody')
+    return [
+        {
+            'number': find_tag(row, 'a').text,
+            'href': find_tag(row, 'a')['href'],
+            'preview_status': find_tag(row, 'abbr')['title'].split(', ')[-1],
+        }
+        for row in rows.find_all('tr')
+    ]
+
+
+def hand_written_pep_card(soup):
+    for dt_tag in soup.find_all('dt'):
+        if dt_tag.text == 'Status:':
+            return {'status': dt_tag.next_sibling.next_sibling.string}
+
+
+def hand_written_whats_new_index(soup):
+    return [
+        {'href': a_tag['href']} for a_tag in soup.select(
+            '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 > a'
+        )
+    ]
+
+
+def hand_written_whats_new_version(soup):
+    return {
+        'title': find_tag(soup, 'h1').text,
+        'editors': find_tag(soup, 'dl').text,
+    }
+
+
+def hand_written_latest_versions(soup):
+    for ul in soup.select('div.sphinxsidebarwrapper ul'):
+        if 'All versions' in ul.text:
+            break
+    versions = []
+    for a_tag in ul.find_all('a'):
+        match = re.search(VERSION_PATTERN, a_tag.text)
+        if match:
+            version, status = match.groups()
+        else:
+            version, status = a_tag.text, ''
+        versions.append(
+            {'href': a_tag['href'], 'version': version, 'status': status}
+        )
+    return versions
+
+
+def page_kinds(pages):
+    """Вид страницы: адрес, фильтр разбора, ручное и описанное извлечение."""
+    return {
+        'pep-index': (
+            PEP_URL, SoupStrainer(id='numerical-index'),
+            hand_written_pep_index, specs.PEP_INDEX.extract_all,
+        ),
+        'pep-card': (
+            next(url for url in pages if url.startswith(PEP_URL + 'pep-')),
+            SoupStrainer('dl'),
+            hand_written_pep_card, specs.PEP_CARD.extract,
+        ),
+        'whats-new-index': (
+            WHATS_NEW_URL, SoupStrainer(id='what-s-new-in-python'),
+            hand_written_whats_new_index, specs.WHATS_NEW_INDEX.extract_all,
+        ),
+        'whats-new-version': (
+            f'{WHATS_NEW_URL}{whats_new_versions(1)[0]}.html',
+            SoupStrainer(['h1', 'dl']),
+            hand_written_whats_new_version, specs.WHATS_NEW_VERSION.extract,
+        ),
+        'latest-versions': (
+            MAIN_DOC_URL,
+            SoupStrainer('div', class_='sphinxsidebarwrapper'),
+            hand_written_latest_versions, specs.LATEST_VERSIONS.extract_all,
+        ),
+    }
+
+
+def best_ms(call, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        call()
+        timings.append(time.perf_counter() - start)
+    return round(min(timings) * 1000, 3)
+
+
+def measure(build, extract, repeat):
+    tree = build()
+    return {
+        'total_ms': best_ms(lambda: extract(build()), repeat),
+        'extract_ms': best_ms(lambda: extract(tree), repeat),
+    }, extract(tree)
+
+
+def benchmark_kind(text, strainer, hand_written, spec, repeat):
+    def strained_soup():
+        return BeautifulSoup(text, features='lxml', parse_only=strainer)
+
+    ways = {
+        'hand-written': (strained_soup, hand_written),
+        'spec-bs4': (strained_soup, spec),
+        'spec-lxml': (lambda: document_fromstring(text), spec),
+    }
+    result, extracted = {}, []
+    for way, (build, extract) in ways.items():
+        result[way], fields = measure(build, extract, repeat)
+        extracted.append(fields)
+    result['same_fields'] = all(
+        fields == extracted[0] for fields in extracted
+    )
+    return result
+
+
+def benchmark(peps, versions, repeat):
+    pages = build_pages(peps=peps, versions=versions)
+    return {
+        'commit': current_commit(),
+        'created': dt.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'scale': {'peps': peps, 'versions': versions, 'repeat': repeat},
+        'pages': {
+            kind: benchmark_kind(pages[url], strainer, hand_written, spec,
+                                 repeat)
+            for kind, (url, strainer, hand_written, spec)
+            in page_kinds(pages).items()
+        },
+    }
+
+
+def print_report(report):
+    print(ROW.format('page', 'way', 'total, ms', 'extract, ms', 'same'))
+    for kind, result in report['pages'].items():
+        for way in ('hand-written', 'spec-bs4', 'spec-lxml'):
+            print(ROW.format(
+                kind, way, result[way]['total_ms'],
+                result[way]['extract_ms'], str(result['same_fields'])
+            ))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Описания извлечения против ручного разбора страниц'
+    )
+    parser.add_argument('--peps', type=int, default=700)
+    parser.add_argument('--versions', type=int, default=22)
+    parser.add_argument(
+        '--repeat',
+        type=int,
+        default=20,
+        help='Число замеров каждой страницы, берётся лучший'
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Куда записать результаты вместо benchmarks/results'
+    )
+    return parser.parse_args(argv)
+
+
+def run(argv=None):
+    args = parse_args(argv)
+    report = benchmark(args.peps, args.versions, args.repeat)
+    print_report(report)
+    output = args.output or RESULTS_DIR / 'extraction_{}_{}.json'.format(
+        dt.datetime.now().strftime(DATETIME_FORMAT), report['commit']
+    )
+    output.parent.mkdir(exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f'Результаты сохранены: {output}')
+    return report
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,283 @@
+"""Offline copies of the parsed sites in real-world sizes.
+
+The pages reproduce the markup the parser relies on and pad it with the
+same kind of navigation, sidebars and prose the live pages carry, so that
+parse time and memory are representative: the PEP index is ~700 rows,
+a PEP card and a What's New page weigh tens to hundreds of kilobytes.
+"""
+import json
+import random
+
+import requests_mock
+
+MAIN_DOC_URL = 'https://docs.python.org/3/'
+PEP_URL = 'https://peps.python.org/'
+PEP_JSON_URL = PEP_URL + 'api/peps.json'
+WHATS_NEW_URL = MAIN_DOC_URL + 'whatsnew/'
+ARCHIVE_URL = MAIN_DOC_URL + 'archives/python-3.12.0-docs-pdf-a4.zip'
+
+PEP_STATUSES = (
+    ('Standards Track', 'Final'),
+    ('Standards Track', 'Rejected'),
+    ('Standards Track', 'Withdrawn'),
+    ('Standards Track', 'Deferred'),
+    ('Standards Track', 'Accepted'),
+    ('Standards Track', 'Draft'),
+    ('Process', 'Active'),
+    ('Informational', 'Superseded'),
+    ('Standards Track', 'Provisional'),
+)
+WORDS = (
+    'python interpreter module syntax object function generator keyword '
+    'argument exception annotation typing proposal implementation backward '
+    'compatibility performance reference rationale specification library '
+    'release bytecode garbage collector descriptor iterator coroutine'
+).split()
+
+PAGE = '''<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8"><meta name="viewport" content="width=device-width">
+<title>{title}</title>
+{head}
+</head>
+<body>
+<div class="related" role="navigation"><ul>{nav}</ul></div>
+<div class="document"><div class="documentwrapper"><div class="bodywrapper">
+<div class="body" role="main">
+{body}
+</div></div></div>
+<div class="sphinxsidebar" role="navigation"><div class="sphinxsidebarwrapper">
+{sidebar}
+</div></div>
+</div>
+<div class="footer">&copy; Copyright 2001-2023, Python Software Foundation.
+</div>
+</body>
+</html>
+'''
+
+
+def prose(rnd, sentences):
+    return ' '.join(
+        ' '.join(rnd.choice(WORDS) for _ in range(rnd.randint(6, 16)))
+        .capitalize() + '.'
+        for _ in range(sentences)
+    )
+
+
+def paragraphs(rnd, count):
+    return ''.join(
+        f'<p>{prose(rnd, 5)} <code class="docutils literal">'
+        f'<span class="pre">{rnd.choice(WORDS)}()</span></code></p>'
+        f'<div class="highlight-python3"><pre>'
+        f'<span class="k">def</span> <span class="nf">'
+        f'{rnd.choice(WORDS)}</span>(<span class="n">x</span>):</pre>'
+        f'</div>'
+        for _ in range(count)
+    )
+
+
+def sections(rnd, count, paragraph_count):
+    return '\n'.join(
+        f'<section id="section-{number}"><h2>{prose(rnd, 1)}'
+        f'<a class="headerlink" href="#section-{number}">¶</a></h2>'
+        f'{paragraphs(rnd, paragraph_count)}</section>'
+        for number in range(count)
+    )
+
+
+def page(rnd, title, body, links=60):
+    return PAGE.format(
+        title=title,
+        head='\n'.join(
+            f'<link rel="stylesheet" href="/_static/{word}.css">'
+            for word in WORDS[:12]
+        ),
+        nav=''.join(
+            f'<li><a href="/{rnd.choice(WORDS)}/">{rnd.choice(WORDS)}</a></li>'
+            for _ in range(links)
+        ),
+        body=body,
+        sidebar='<ul>' + ''.join(
+            f'<li><a href="#{word}">{prose(rnd, 1)}</a></li>'
+            for word in WORDS
+        ) + '</ul>',
+    )
+
+
+def pep_numbers(peps):
+    return [number * 3 + 1 for number in range(peps)]
+
+
+def pep_index(rnd, peps):
+    rows = []
+    for number in pep_numbers(peps):
+        kind, status = PEP_STATUSES[number % len(PEP_STATUSES)]
+        code = kind[0] + ('' if status == 'Draft' else status[0])
+        rows.append(
+            f'<tr class="row-odd"><td><abbr title="{kind}, {status}">{code}'
+            f'</abbr></td><td><a class="pep reference internal" '
+            f'href="pep-{number:04d}/" title="PEP {number}">{number}</a>'
+            f'</td><td><a class="pep reference internal" '
+            f'href="pep-{number:04d}/">{prose(rnd, 1)}</a></td>'
+            f'<td>{rnd.choice(WORDS).title()} {rnd.choice(WORDS).title()}'
+            f'</td></tr>'
+        )
+    rows = '\n'.join(rows)
+    body = (
+        f'<section id="pep-content"><h1>PEP 0 – Index of Python '
+        f'Enhancement Proposals (PEPs)</h1>{sections(rnd, 4, 2)}'
+        f'<section id="numerical-index"><h2>Numerical Index</h2>'
+        f'<table class="pep-zero-table docutils align-default"><thead>'
+        f'<tr><th></th><th>PEP</th><th>Title</th><th>Authors</th></tr>'
+        f'</thead><tbody>{rows}</tbody></table></section></section>'
+    )
+    return page(rnd, 'PEP 0', body)
+
+
+def card_status(number):
+    if number % 50 == 0:
+        return 'Active'
+    return PEP_STATUSES[number % len(PEP_STATUSES)][1]
+
+
+def pep_json(rnd, peps):
+    return json.dumps({
+        str(number): {
+            'number': number,
+            'title': prose(rnd, 1),
+            'authors': rnd.choice(WORDS).title(),
+            'status': card_status(number),
+            'type': PEP_STATUSES[number % len(PEP_STATUSES)][0],
+            'created': '01-Jan-2020',
+            'url': f'{PEP_URL}pep-{number:04d}/',
+        }
+        for number in pep_numbers(peps)
+    }, indent=4)
+
+
+def pep_card(rnd, number):
+    status = card_status(number)
+    body = (
+        f'<section id="pep-content"><h1 class="page-title">PEP {number} – '
+        f'{prose(rnd, 1)}</h1><dl class="rfc2822 field-list simple">'
+        f'<dt class="field-odd">Author<span class="colon">:</span></dt>\n'
+        f'<dd class="field-odd">{rnd.choice(WORDS).title()}</dd>\n'
+        f'<dt class="field-even">Status<span class="colon">:</span></dt>\n'
+        f'<dd class="field-even"><abbr title="{status}">{status}</abbr></dd>\n'
+        f'<dt class="field-odd">Created<span class="colon">:</span></dt>\n'
+        f'<dd class="field-odd">01-Jan-2020</dd>\n</dl>'
+        f'{sections(rnd, rnd.randint(6, 14), 4)}</section>'
+    )
+    return page(rnd, f'PEP {number}', body)
+
+
+def whats_new_versions(versions):
+    return [
+        f'{major}.{minor}'
+        for major, minors in ((3, 13), (2, 7))
+        for minor in range(minors, -1, -1)
+    ][:versions]
+
+
+def toctree_sections(rnd, version):
+    return ''.join(
+        f'<li class="toctree-l2"><a class="reference internal" '
+        f'href="{version}.html#section-{number}">{prose(rnd, 1)}</a></li>'
+        for number in range(8)
+    )
+
+
+def whats_new_index(rnd, versions):
+    items = ''.join(
+        f'<li class="toctree-l1"><a class="reference internal" '
+        f'href="{version}.html">What’s New In Python {version}</a><ul>'
+        f'{toctree_sections(rnd, version)}</ul></li>'
+        for version in whats_new_versions(versions)
+    )
+    body = (
+        f'<section id="what-s-new-in-python"><h1>What’s New in Python</h1>'
+        f'<div class="toctree-wrapper compound"><ul>{items}</ul></div>'
+        f'</section>'
+    )
+    return page(rnd, 'What’s New in Python', body)
+
+
+def whats_new_page(rnd, version):
+    body = (
+        f'<section id="what-s-new-in-python-{version.replace(".", "-")}">'
+        f'<h1>What’s New In Python {version}<a class="headerlink" '
+        f'href="#">¶</a></h1><dl class="field-list simple">'
+        f'<dt class="field-odd">Editor<span class="colon">:</span></dt>'
+        f'<dd class="field-odd"><p>{rnd.choice(WORDS).title()} '
+        f'{rnd.choice(WORDS).title()}</p></dd></dl>'
+        f'{sections(rnd, rnd.randint(20, 40), 5)}</section>'
+    )
+    return page(rnd, f'What’s New In Python {version}', body)
+
+
+def main_doc_page(rnd):
+    versions = ''.join(
+        f'<li><a href="https://docs.python.org/3.{minor}/">'
+        f'Python 3.{minor} ({status})</a></li>'
+        for minor, status in (
+            (13, 'in development'), (12, 'stable'), (11, 'security-fixes'),
+            (10, 'security-fixes'), (9, 'security-fixes'), (8, 'EOL'),
+        )
+    )
+    html = page(rnd, 'Python 3.12 documentation', sections(rnd, 8, 2))
+    return html.replace(
+        '<div class="sphinxsidebarwrapper">',
+        f'<div class="sphinxsidebarwrapper"><h3>Docs by version</h3><ul>'
+        f'{versions}<li><a href="https://www.python.org/doc/versions/">'
+        f'All versions</a></li></ul>',
+    )
+
+
+def download_page(rnd):
+    links = ''.join(
+        f'<tr><td>{kind}</td><td><a href="archives/python-3.12.0-docs-'
+        f'{kind}.zip">Download</a> (ca. 17 MiB)</td></tr>'
+        for kind in ('pdf-a4', 'pdf-letter', 'html', 'text', 'texinfo')
+    )
+    return page(
+        rnd,
+        'Download Python 3.12 Documentation',
+        f'<h1>Download</h1><table class="docutils">{links}</table>'
+        f'{sections(rnd, 3, 2)}',
+    )
+
+
+def build_pages(peps=700, versions=22):
+    """Return {url: text} for every page the four modes request."""
+    rnd = random.Random(0)
+    pages = {
+        PEP_URL: pep_index(rnd, peps),
+        WHATS_NEW_URL: whats_new_index(rnd, versions),
+        MAIN_DOC_URL: main_doc_page(rnd),
+        MAIN_DOC_URL + 'download.html': download_page(rnd),
+    }
+    for number in pep_numbers(peps):
+        pages[f'{PEP_URL}pep-{number:04d}/'] = pep_card(rnd, number)
+    for version in whats_new_versions(versions):
+        pages[f'{WHATS_NEW_URL}{version}.html'] = whats_new_page(rnd, version)
+    # last, so that the other pages stay the same as in older reports
+    pages[PEP_JSON_URL] = pep_json(rnd, peps)
+    return pages
+
+
+def build_adapter(pages, archive_size=16 * 1024 * 1024):
+    adapter = requests_mock.Adapter()
+    for url, html in pages.items():
+        adapter.register_uri(
+            'GET',
+            url,
+            text=html,
+            headers={'Content-Type': 'text/html; charset=utf-8'},
+        )
+    archive = bytes(range(256)) * (archive_size // 256)
+    headers = {'ETag': '"archive"', 'Content-Length': str(len(archive))}
+    adapter.register_uri('HEAD', ARCHIVE_URL, headers=headers)
+    adapter.register_uri('GET', ARCHIVE_URL, content=archive, headers=headers)
+    return adapter
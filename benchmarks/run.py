@@ -0,0 +1,259 @@
+"""Offline benchmark of every parser mode.
+
+Usage: python benchmarks/run.py [--peps N] [--workers N] [--pep-source SOURCE]
+                                [--extract-cache] [--compare FILE]
+
+Every mode runs twice against the pages from pages.py: with a cold
+in-memory cache and then with a warm one. Wall time, HTTP requests per
+second, CPU time spent in BeautifulSoup per page and peak memory
+(tracemalloc, measured in a separate cold run) are printed and written to
+benchmarks/results/<datetime>_<commit>.json. With --extract-cache every
+session gets its own empty cache of extracted fields, so the warm run
+shows how much parsing it saves.
+"""
+import argparse
+import datetime as dt
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+
+BASE_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BASE_DIR.parent / 'src'))
+
+from requests_cache import CachedSession  # noqa: E402
+
+import main  # noqa: E402
+import utils  # noqa: E402
+from pages import build_adapter, build_pages  # noqa: E402
+
+RESULTS_DIR = BASE_DIR / 'results'
+DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
+ROW = '{:<16}{:<6}{:>10}{:>10}{:>12}{:>12}{:>12}'
+
+
+class ParseTimer:
+    def __init__(self):
+        self.pages = 0
+        self.seconds = 0.0
+
+    def wrap(self, parse):
+        def timed_parse(*args, **kwargs):
+            # CPU time of the calling thread, so that worker threads waiting
+            # for the GIL do not inflate the cost of a single parse
+            start = time.thread_time()
+            tree = parse(*args, **kwargs)
+            self.seconds += time.thread_time() - start
+            self.pages += 1
+            return tree
+        return timed_parse
+
+
+def run_mode(
+    mode, session, adapter, workers, trace_memory=False, **options
+):
+    timer = ParseTimer()
+    # modes parse with lxml, the BeautifulSoup helpers are still counted
+    parsers = {
+        name: timer.wrap(getattr(utils, name))
+        for name in ('BeautifulSoup', 'document_fromstring')
+    }
+    requests_before = len(adapter.request_history)
+    with tempfile.TemporaryDirectory() as base_dir, \
+            mock.patch.multiple(utils, **parsers), \
+            mock.patch.object(main, 'BASE_DIR', Path(base_dir)):
+        if trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        results = main.MODE_TO_FUNCTION[mode](
+            session, workers=workers, **options
+        )
+        if results is not None:
+            # modes may be generators, drain them without keeping rows
+            deque(results, maxlen=0)
+        wall = time.perf_counter() - start
+        if trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    requests = len(adapter.request_history) - requests_before
+    result = {
+        'wall_seconds': round(wall, 4),
+        'requests': requests,
+        'requests_per_second': round(requests / wall, 1),
+        'pages_parsed': timer.pages,
+        'parse_ms_per_page': round(
+            timer.seconds * 1000 / timer.pages, 3
+        ) if timer.pages else 0.0,
+    }
+    if trace_memory:
+        result['peak_memory_mib'] = round(peak / 2 ** 20, 2)
+    return result
+
+
+def new_session(adapter):
+    session = CachedSession(backend='memory')
+    session.mount('https://', adapter)
+    return session
+
+
+@contextmanager
+def extract_cache(enabled):
+    if not enabled:
+        yield
+        return
+    with tempfile.TemporaryDirectory() as cache_dir:
+        main.extract_cache.open(Path(cache_dir) / 'extracts.sqlite')
+        try:
+            yield
+        finally:
+            main.extract_cache.close()
+
+
+def benchmark_mode(mode, adapter, workers, extracts=False, **options):
+    session = new_session(adapter)
+    with extract_cache(extracts):
+        cold = run_mode(mode, session, adapter, workers, **options)
+        warm = run_mode(mode, session, adapter, workers, **options)
+    with extract_cache(extracts):
+        memory = run_mode(
+            mode, new_session(adapter), adapter, workers, trace_memory=True,
+            **options
+        )
+    cold['peak_memory_mib'] = memory['peak_memory_mib']
+    return {'cold': cold, 'warm': warm}
+
+
+def current_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_report(report, baseline=None):
+    print(ROW.format(
+        'mode', 'cache', 'wall, s', 'req/s', 'parse, ms', 'peak, MiB',
+        'vs base'
+    ))
+    for mode, runs in report['modes'].items():
+        for cache, result in runs.items():
+            ratio = ''
+            if baseline and mode in baseline['modes']:
+                base_wall = baseline['modes'][mode][cache]['wall_seconds']
+                ratio = f'{result["wall_seconds"] / base_wall:.2f}x'
+            print(ROW.format(
+                mode,
+                cache,
+                result['wall_seconds'],
+                result['requests_per_second'],
+                result['parse_ms_per_page'],
+                result.get('peak_memory_mib', ''),
+                ratio,
+            ))
+
+
+def benchmark(modes, peps, versions, workers, pep_source, extracts=False):
+    adapter = build_adapter(build_pages(peps=peps, versions=versions))
+    return {
+        'commit': current_commit(),
+        'created': dt.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'scale': {
+            'peps': peps,
+            'versions': versions,
+            'workers': workers,
+            'pep_source': pep_source,
+            'extract_cache': extracts,
+        },
+        'modes': {
+            mode: benchmark_mode(
+                mode, adapter, workers, extracts, pep_source=pep_source
+            )
+            for mode in modes
+        },
+    }
+
+
+def parser_mode(value):
+    # choices= cannot be combined with an empty nargs='*' default
+    if value not in main.MODE_TO_FUNCTION:
+        raise argparse.ArgumentTypeError(f'Неизвестный режим: {value}')
+    return value
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Бенчмарк режимов парсера')
+    parser.add_argument(
+        'modes',
+        nargs='*',
+        type=parser_mode,
+        metavar='MODE',
+        help='Режимы для замера, по умолчанию все: {}'.format(
+            ', '.join(main.MODE_TO_FUNCTION)
+        )
+    )
+    parser.add_argument('--peps', type=int, default=700)
+    parser.add_argument('--versions', type=int, default=22)
+    parser.add_argument('-w', '--workers', type=int, default=main.WORKERS)
+    parser.add_argument(
+        '--pep-source',
+        choices=tuple(main.PEP_SOURCES),
+        default=main.JSON_PEP_SOURCE,
+        help='Источник статусов PEP для режима pep'
+    )
+    parser.add_argument(
+        '--extract-cache',
+        action='store_true',
+        help='Замерять с кешем извлечённых из страниц данных'
+    )
+    parser.add_argument(
+        '--compare',
+        type=Path,
+        help='Файл прошлого замера для сравнения'
+    )
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Куда записать результаты вместо benchmarks/results'
+    )
+    return parser.parse_args(argv)
+
+
+def run(argv=None):
+    args = parse_args(argv)
+    report = benchmark(
+        args.modes or list(main.MODE_TO_FUNCTION),
+        args.peps,
+        args.versions,
+        args.workers,
+        args.pep_source,
+        args.extract_cache,
+    )
+    baseline = None
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+    print_report(report, baseline)
+    output = args.output or RESULTS_DIR / '{}_{}.json'.format(
+        dt.datetime.now().strftime(DATETIME_FORMAT), report['commit']
+    )
+    output.parent.mkdir(exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f'Результаты сохранены: {output}')
+    return report
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,127 @@
+"""Scaling of the parsing stage across processes.
+
+Usage: python benchmarks/scaling.py [MODE ...] [--processes N [N ...]]
+
+The cache is warmed once, so the timed runs do no network I/O and are
+bound by tree building and field extraction. Each mode is run with every
+number of parse processes and the speedup over a single process is
+printed and written to benchmarks/results/scaling_<datetime>_<commit>.json.
+Workers are spawned on every run, so their start-up cost is included.
+"""
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+from pathlib import Path
+
+from run import (DATETIME_FORMAT, RESULTS_DIR, current_commit, main,
+                 new_session, run_mode)
+from pages import build_adapter, build_pages
+
+SCALED_MODES = ('pep', 'whats-new')
+ROW = '{:<12}{:>10}{:>10}{:>10}'
+
+
+def default_processes():
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+    return counts
+
+
+def scale_mode(mode, adapter, workers, processes):
+    session = new_session(adapter)
+    # the JSON index has no pages to parse, the cards do
+    options = {'pep_source': main.HTML_PEP_SOURCE}
+    run_mode(mode, session, adapter, workers, **options)
+    walls = {
+        count: run_mode(
+            mode, session, adapter, workers, parse_processes=count, **options
+        )['wall_seconds']
+        for count in processes
+    }
+    return {
+        str(count): {
+            'wall_seconds': wall,
+            'speedup': round(walls[processes[0]] / wall, 2),
+        }
+        for count, wall in walls.items()
+    }
+
+
+def print_report(report):
+    print(ROW.format('mode', 'processes', 'wall, s', 'speedup'))
+    for mode, runs in report['modes'].items():
+        for count, result in runs.items():
+            print(ROW.format(
+                mode, count, result['wall_seconds'], f'{result["speedup"]}x'
+            ))
+
+
+def scaled_mode(value):
+    if value not in SCALED_MODES:
+        raise argparse.ArgumentTypeError(f'Неизвестный режим: {value}')
+    return value
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Масштабирование разбора страниц по процессам'
+    )
+    parser.add_argument(
+        'modes',
+        nargs='*',
+        type=scaled_mode,
+        metavar='MODE',
+        help='Режимы для замера, по умолчанию: {}'.format(
+            ', '.join(SCALED_MODES)
+        )
+    )
+    parser.add_argument(
+        '--processes',
+        nargs='+',
+        type=int,
+        default=default_processes(),
+        help='Числа процессов разбора, по умолчанию степени двойки до '
+             'числа ядер'
+    )
+    parser.add_argument('--peps', type=int, default=700)
+    parser.add_argument('--versions', type=int, default=22)
+    parser.add_argument('-w', '--workers', type=int, default=main.WORKERS)
+    parser.add_argument(
+        '--output',
+        type=Path,
+        help='Куда записать результаты вместо benchmarks/results'
+    )
+    return parser.parse_args(argv)
+
+
+def run(argv=None):
+    args = parse_args(argv)
+    adapter = build_adapter(
+        build_pages(peps=args.peps, versions=args.versions)
+    )
+    report = {
+        'commit': current_commit(),
+        'created': dt.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'cpu_count': os.cpu_count(),
+        'scale': {'peps': args.peps, 'versions': args.versions},
+        'modes': {
+            mode: scale_mode(mode, adapter, args.workers, args.processes)
+            for mode in args.modes or SCALED_MODES
+        },
+    }
+    print_report(report)
+    output = args.output or RESULTS_DIR / 'scaling_{}_{}.json'.format(
+        dt.datetime.now().strftime(DATETIME_FORMAT), report['commit']
+    )
+    output.parent.mkdir(exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+    print(f'Результаты сохранены: {output}')
+    return report
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,167 @@
+from collections import namedtuple
+from functools import partial
+from tempfile import TemporaryFile
+from threading import Lock
+import json
+import logging
+import sqlite3
+import time
+import zlib
+
+from constants import ARCHIVE_COMPRESSION, CHUNK_SIZE
+
+RECORD_MESSAGE = 'HTTP-обмен записывается в архив: {}'
+REPLAY_MESSAGE = 'HTTP-обмен воспроизводится из архива: {}, ответов: {}'
+RECORDED_MESSAGE = 'Ответов в архиве: {}'
+ARCHIVE_NOT_FOUND = 'Нет архива для воспроизведения: {}'
+NOT_RECORDED = 'Ответа на {} {} нет в архиве'
+CREATE_TABLE = '''CREATE TABLE IF NOT EXISTS exchanges (
+    method TEXT NOT NULL,
+    url TEXT NOT NULL,
+    status INTEGER NOT NULL,
+    reason TEXT,
+    headers TEXT NOT NULL,
+    body BLOB NOT NULL,
+    recorded REAL NOT NULL,
+    PRIMARY KEY (method, url)
+)'''
+# the stored body is already decoded and whole
+TRANSFER_HEADERS = frozenset((
+    'connection', 'content-encoding', 'keep-alive', 'transfer-encoding',
+))
+
+INSERT_EXCHANGE = (
+    'INSERT OR REPLACE INTO exchanges VALUES (?, ?, ?, ?, ?, {}, ?)'
+)
+
+Exchange = namedtuple('Exchange', 'status reason headers body')
+
+
+def stored_headers(headers, size):
+    headers = {
+        name: value for name, value in headers.items()
+        if name.lower() not in TRANSFER_HEADERS
+    }
+    if size:
+        headers['Content-Length'] = str(size)
+    return json.dumps(headers)
+
+
+def read_chunks(file):
+    return iter(partial(file.read, CHUNK_SIZE), b'')
+
+
+class HttpArchive:
+    """Запросы и ответы запуска в одном файле SQLite.
+
+    Записанный архив отвечает на те же запросы без сети: ответ ищется
+    по методу и адресу в первичном ключе, тело хранится сжатым zlib.
+    Повторный запрос заменяет прежний ответ.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.connection = None
+        self.replaying = False
+
+    @property
+    def recording(self):
+        return self.connection is not None and not self.replaying
+
+    def open(self, path, replay=False):
+        self.close()
+        if replay and not path.exists():
+            raise FileNotFoundError(ARCHIVE_NOT_FOUND.format(path))
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # responses are recorded from the fetching threads
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(CREATE_TABLE)
+        self.replaying = replay
+        if replay:
+            logging.info(REPLAY_MESSAGE.format(path, len(self)))
+        else:
+            logging.info(RECORD_MESSAGE.format(path))
+
+    def commit(self):
+        if self.connection is None:
+            return
+        with self.lock:
+            self.connection.commit()
+
+    def close(self):
+        if self.connection is None:
+            return
+        if self.recording:
+            logging.info(RECORDED_MESSAGE.format(len(self)))
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
+            self.replaying = False
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute(
+                'SELECT COUNT(*) FROM exchanges'
+            ).fetchone()[0]
+
+    def record(self, method, url, status, reason, headers, body):
+        if not self.recording:
+            return
+        headers = stored_headers(headers, len(body))
+        body = zlib.compress(body, ARCHIVE_COMPRESSION)
+        with self.lock:
+            self.connection.execute(
+                INSERT_EXCHANGE.format('?'),
+                (method, url, status, reason, headers, body, time.time())
+            )
+
+    def record_file(self, method, url, status, reason, headers, path):
+        """Записывает телом ответа файл, не читая его в память целиком."""
+        if not self.recording:
+            return
+        headers = stored_headers(headers, path.stat().st_size)
+        with TemporaryFile() as compressed:
+            compressor = zlib.compressobj(ARCHIVE_COMPRESSION)
+            with open(path, 'rb') as file:
+                for chunk in read_chunks(file):
+                    compressed.write(compressor.compress(chunk))
+            compressed.write(compressor.flush())
+            size = compressed.tell()
+            compressed.seek(0)
+            with self.lock:
+                if not hasattr(self.connection, 'blobopen'):
+                    # python < 3.11: only the compressed body is in memory
+                    self.connection.execute(
+                        INSERT_EXCHANGE.format('?'),
+                        (method, url, status, reason, headers,
+                         compressed.read(), time.time())
+                    )
+                    return
+                # the blob is reserved at its size and filled piece by piece
+                row = self.connection.execute(
+                    INSERT_EXCHANGE.format('zeroblob(?)'),
+                    (method, url, status, reason, headers, size, time.time())
+                ).lastrowid
+                with self.connection.blobopen(
+                    'exchanges', 'body', row
+                ) as blob:
+                    for chunk in read_chunks(compressed):
+                        blob.write(chunk)
+
+    def replay(self, method, url):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT status, reason, headers, body FROM exchanges '
+                'WHERE method = ? AND url = ?',
+                (method, url)
+            ).fetchone()
+        if row is None:
+            raise LookupError(NOT_RECORDED.format(method, url))
+        status, reason, headers, body = row
+        return Exchange(
+            status, reason, json.loads(headers), zlib.decompress(body)
+        )
+
+
+http_archive = HttpArchive()
@@ -0,0 +1,112 @@
+import asyncio
+
+import aiohttp
+from requests import Request
+from requests.structures import CaseInsensitiveDict
+from requests_cache import CachedResponse
+from requests_cache.models import CachedRequest
+from requests_cache.policy.expiration import (get_expiration_datetime,
+                                              get_url_expiration)
+
+from archive import http_archive
+from constants import KEEPALIVE_TIMEOUT
+from http_cache import access_log, revalidation
+from metrics import registry
+from sessions import DEFAULT_TIMEOUTS
+from throttle import throttle
+from utils import (LOAD_ERROR_MESSAGE, archive_response, get_response,
+                   parse_tree)
+
+FETCH_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
+
+
+def async_client(limit, timeouts=DEFAULT_TIMEOUTS):
+    # the connector limit is the concurrency limit of the whole engine
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=limit, keepalive_timeout=KEEPALIVE_TIMEOUT
+        ),
+        timeout=aiohttp.ClientTimeout(
+            sock_connect=timeouts.connect, sock_read=timeouts.read
+        )
+    )
+
+
+def validation_headers(response):
+    headers = {}
+    if response is None:
+        return headers
+    if 'ETag' in response.headers:
+        headers['If-None-Match'] = response.headers['ETag']
+    if 'Last-Modified' in response.headers:
+        headers['If-Modified-Since'] = response.headers['Last-Modified']
+    return headers
+
+
+def expiration(session, url, expire_after=None):
+    if expire_after is not None:
+        return get_expiration_datetime(expire_after)
+    expire_after = get_url_expiration(url, session.settings.urls_expire_after)
+    if expire_after is None:
+        expire_after = session.settings.expire_after
+    return get_expiration_datetime(expire_after)
+
+
+def store_response(session, key, response, expire_after=None):
+    if response.status_code in session.settings.allowable_codes:
+        session.cache.save_response(
+            response,
+            cache_key=key,
+            expires=expiration(session, response.url, expire_after)
+        )
+
+
+async def get_response_async(
+    client, session, url, encoding='utf-8', expire_after=None
+):
+    if http_archive.replaying:
+        # the archive answers through the session, aiohttp would go online
+        return get_response(session, url, encoding, expire_after)
+    request = Request('GET', url).prepare()
+    key = session.cache.create_key(request)
+    cached = session.cache.get_response(key)
+    access_log.touch(key)
+    fresh = cached is not None and not cached.is_expired
+    if fresh and not (expire_after is None and revalidation.needed(url)):
+        registry.record_response(cached)
+        archive_response(url, cached)
+        cached.encoding = encoding
+        return cached
+
+    async def send():
+        with registry.timer('fetch'):
+            async with client.get(
+                url, headers=validation_headers(cached)
+            ) as raw_response:
+                return CachedResponse(
+                    content=await raw_response.read(),
+                    url=str(raw_response.url),
+                    status_code=raw_response.status,
+                    reason=raw_response.reason,
+                    headers=CaseInsensitiveDict(raw_response.headers),
+                    request=CachedRequest.from_request(request),
+                )
+
+    try:
+        response = await throttle.send_async(url, send, FETCH_ERRORS)
+    except FETCH_ERRORS as e:
+        registry.inc('fetch_errors')
+        raise ConnectionError(LOAD_ERROR_MESSAGE.format(url, e))
+    registry.inc('cache_misses')
+    registry.inc('bytes_transferred', len(response.content))
+    if response.status_code == 304 and cached is not None:
+        response = cached
+    store_response(session, key, response, expire_after)
+    archive_response(url, response)
+    response.encoding = encoding
+    return response
+
+
+async def make_tree_async(client, session, url):
+    response = await get_response_async(client, session, url)
+    return parse_tree(response.text)
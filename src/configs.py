@@ -1,18 +1,115 @@
 import argparse
+import datetime as dt
 import logging
+import os
 from logging.handlers import RotatingFileHandler
+from pathlib import Path
 
-from constants import (EXPORT_OUTPUT_KEY, LOG_DIR, LOG_FILE,
-                       NICE_CONSOLE_OUTPUT_KEY)
+from constants import (CONNECT_TIMEOUT, DATETIME_FORMAT, ENV_PREFIX,
+                       EXPIRE_AFTER, EXPORT_OUTPUT_KEY, FILESYSTEM_BACKEND,
+                       HTML_PEP_SOURCE, HTTP_CACHE, JSON_METRICS_KEY,
+                       JSON_PEP_SOURCE, KEEP_CACHE_POLICY, LIVE_VERSIONS,
+                       LOG_DIR, LOG_FILE, MEMORY_BACKEND, NEVER_EXPIRE,
+                       NICE_CONSOLE_OUTPUT_KEY, PARQUET_OUTPUT_KEY,
+                       PARSE_PROCESSES, PROMETHEUS_METRICS_KEY, RATE_LIMIT,
+                       READ_TIMEOUT, RETRIES, REVALIDATE_CACHE_POLICY,
+                       SERVE_HOST, SQLITE_BACKEND, SQLITE_OUTPUT_KEY,
+                       URLS_EXPIRE_AFTER, WATCH_INTERVAL, WORKERS)
 
 LOG_FORMAT = '"%(asctime)s - [%(levelname)s] - %(message)s"'
 DT_FORMAT = '%d.%m.%Y %H:%M:%S'
+NOT_POSITIVE_MESSAGE = 'Ожидалось целое число больше нуля: {}'
+NEGATIVE_MESSAGE = 'Ожидалось целое неотрицательное число: {}'
+RATE_MESSAGE = 'Ожидалось число запросов в секунду больше нуля: {}'
+TIMEOUT_MESSAGE = 'Ожидалось число секунд больше нуля: {}'
+URL_TTL_MESSAGE = 'Ожидалось ШАБЛОН=СЕКУНДЫ: {}'
+SINCE_MESSAGE = 'Ожидалась метка запуска {} или дата {}: {}'
+SINCE_DATE_FORMAT = '%Y-%m-%d'
+INTERVAL_MESSAGE = 'Ожидалось [РЕЖИМ=]СЕКУНДЫ больше нуля: {}'
+ADDRESS_MESSAGE = 'Ожидалось [АДРЕС:]ПОРТ: {}'
+
+
+def positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(NOT_POSITIVE_MESSAGE.format(value))
+    return number
+
+
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(NEGATIVE_MESSAGE.format(value))
+    return number
+
+
+def request_rate(value):
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(RATE_MESSAGE.format(value))
+    return number
+
+
+def seconds(value):
+    number = float(value)
+    if not number > 0:
+        raise argparse.ArgumentTypeError(TIMEOUT_MESSAGE.format(value))
+    return number
+
+
+def from_env(name, default=None):
+    # argparse converts string defaults with the type of the argument
+    return os.environ.get(ENV_PREFIX + name, default)
+
+
+def run_or_date(value):
+    # run labels sort as strings, a date selects every run of that day on
+    for date_format in (DATETIME_FORMAT, SINCE_DATE_FORMAT):
+        try:
+            dt.datetime.strptime(value, date_format)
+            return value
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(
+        SINCE_MESSAGE.format(DATETIME_FORMAT, SINCE_DATE_FORMAT, value)
+    )
+
+
+def mode_interval(value):
+    mode, _, seconds = value.rpartition('=')
+    try:
+        interval = float(seconds)
+    except ValueError:
+        interval = 0
+    if not interval > 0:
+        raise argparse.ArgumentTypeError(INTERVAL_MESSAGE.format(value))
+    return mode or None, interval
+
+
+def listen_address(value):
+    host, _, port = value.rpartition(':')
+    try:
+        port = int(port)
+    except ValueError:
+        port = -1
+    if not 0 <= port < 2 ** 16:
+        raise argparse.ArgumentTypeError(ADDRESS_MESSAGE.format(value))
+    return host or SERVE_HOST, port
+
+
+def url_ttl(value):
+    pattern, _, seconds = value.rpartition('=')
+    try:
+        return pattern, int(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(URL_TTL_MESSAGE.format(value))
 
 
 def configure_argument_parser(available_modes):
     parser = argparse.ArgumentParser(description='Парсер документации Python')
     parser.add_argument(
         'mode',
+        nargs='+',
         choices=available_modes,
         help='Режимы работы парсера'
     )
@@ -25,12 +122,249 @@ def configure_argument_parser(available_modes):
     parser.add_argument(
         '-o',
         '--output',
-        choices=(NICE_CONSOLE_OUTPUT_KEY, EXPORT_OUTPUT_KEY),
+        choices=(
+            NICE_CONSOLE_OUTPUT_KEY,
+            EXPORT_OUTPUT_KEY,
+            SQLITE_OUTPUT_KEY,
+            PARQUET_OUTPUT_KEY
+        ),
         help='Дополнительные способы вывода данных'
     )
+    parser.add_argument(
+        '-w',
+        '--workers',
+        type=positive_int,
+        default=WORKERS,
+        help='Число параллельных загрузок страниц'
+    )
+    parser.add_argument(
+        '--pool-size',
+        type=positive_int,
+        default=from_env('POOL_SIZE'),
+        help='Число соединений с одним сайтом в пуле, по умолчанию '
+             'по числу загрузок всех одновременных режимов'
+    )
+    parser.add_argument(
+        '--connect-timeout',
+        type=seconds,
+        default=from_env('CONNECT_TIMEOUT', CONNECT_TIMEOUT),
+        metavar='SECONDS',
+        help='Срок ожидания соединения с сайтом'
+    )
+    parser.add_argument(
+        '--read-timeout',
+        type=seconds,
+        default=from_env('READ_TIMEOUT', READ_TIMEOUT),
+        metavar='SECONDS',
+        help='Срок ожидания данных от сайта'
+    )
+    parser.add_argument(
+        '--rate',
+        type=request_rate,
+        default=from_env('RATE', RATE_LIMIT),
+        help='Предельное число запросов в секунду к одному сайту'
+    )
+    parser.add_argument(
+        '--retries',
+        type=non_negative_int,
+        default=from_env('RETRIES', RETRIES),
+        help='Число повторов запроса после сетевой ошибки '
+             'или ответа 429, 502, 503, 504'
+    )
+    parser.add_argument(
+        '-p',
+        '--parse-processes',
+        type=positive_int,
+        default=PARSE_PROCESSES,
+        help='Число процессов для разбора страниц в режимах pep и whats-new'
+    )
+    parser.add_argument(
+        '-j',
+        '--concurrent-modes',
+        action='store_true',
+        help='Выполнять несколько режимов одновременно'
+    )
+    parser.add_argument(
+        '-a',
+        '--asyncio',
+        action='store_true',
+        help='Асинхронная загрузка страниц в режимах pep и whats-new'
+    )
+    parser.add_argument(
+        '-i',
+        '--incremental',
+        action='store_true',
+        help='Загружать только новые и изменившиеся карточки PEP '
+             'и страницы версий'
+    )
+    parser.add_argument(
+        '--live-versions',
+        type=positive_int,
+        default=LIVE_VERSIONS,
+        metavar='N',
+        help='Сколько самых новых версий whats-new загружать '
+             'в инкрементальном режиме всегда'
+    )
+    parser.add_argument(
+        '--pep-source',
+        choices=(JSON_PEP_SOURCE, HTML_PEP_SOURCE),
+        default=JSON_PEP_SOURCE,
+        help='Брать статусы PEP из JSON-каталога одним запросом '
+             'или из карточек'
+    )
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Не завершаться, а опрашивать режимы снова и выводить '
+             'только изменившиеся строки, до SIGTERM'
+    )
+    parser.add_argument(
+        '--serve',
+        type=listen_address,
+        metavar='[HOST:]PORT',
+        help='Отдавать результаты режимов в JSON по HTTP на этом адресе, '
+             'обновляя их в фоне'
+    )
+    parser.add_argument(
+        '--interval',
+        type=mode_interval,
+        action='append',
+        metavar='[MODE=]SECONDS',
+        help='Интервал опроса в режимах --watch и --serve, для всех '
+             'режимов или для одного'
+    )
+    parser.add_argument(
+        '--since',
+        type=run_or_date,
+        help='Режим pep-changes: смены статуса начиная с этого запуска '
+             'или даты, по умолчанию - за последний запуск'
+    )
+    parser.add_argument(
+        '--no-extract-cache',
+        action='store_true',
+        help='Разбирать все страницы заново, не используя кеш извлечённых '
+             'из них данных'
+    )
+    parser.add_argument(
+        '--cache-policy',
+        choices=(KEEP_CACHE_POLICY, REVALIDATE_CACHE_POLICY),
+        help='Хранить кеш бессрочно или перепроверять устаревшие страницы, '
+             'по умолчанию перепроверять только в режимах --watch и --serve'
+    )
+    parser.add_argument(
+        '--cache-backend',
+        choices=(SQLITE_BACKEND, FILESYSTEM_BACKEND, MEMORY_BACKEND),
+        default=SQLITE_BACKEND,
+        help='Хранилище кеша HTTP'
+    )
+    parser.add_argument(
+        '--cache-path',
+        type=Path,
+        default=HTTP_CACHE,
+        help='Файл или каталог кеша HTTP'
+    )
+    parser.add_argument(
+        '--cache-max-size',
+        type=positive_int,
+        metavar='MB',
+        help='Предельный размер кеша HTTP, давно не читавшиеся '
+             'страницы вытесняются'
+    )
+    parser.add_argument(
+        '--ttl',
+        type=url_ttl,
+        action='append',
+        metavar='PATTERN=SECONDS',
+        help='Срок жизни кеша для адресов по шаблону, -1 - бессрочно'
+    )
+    parser.add_argument(
+        '-m',
+        '--metrics',
+        choices=(JSON_METRICS_KEY, PROMETHEUS_METRICS_KEY),
+        help='Сохранить метрики этапов работы в файл выбранного формата'
+    )
+    archive = parser.add_mutually_exclusive_group()
+    archive.add_argument(
+        '--record',
+        type=Path,
+        metavar='FILE',
+        help='Записать все запросы и ответы запуска в архив'
+    )
+    archive.add_argument(
+        '--replay',
+        type=Path,
+        metavar='FILE',
+        help='Отвечать на запросы из архива --record, без сети'
+    )
     return parser
 
 
+def configure_backend(cli_args):
+    if cli_args.replay is not None:
+        # a replayed run neither reads nor fills the cache on disk
+        return dict(
+            cache_name=str(cli_args.cache_path), backend=MEMORY_BACKEND
+        )
+    settings = dict(
+        cache_name=str(cli_args.cache_path),
+        backend=cli_args.cache_backend
+    )
+    if cli_args.cache_backend == SQLITE_BACKEND:
+        # readers are not blocked while the fetching threads write
+        settings['wal'] = True
+    return settings
+
+
+def cache_policy(cli_args):
+    if cli_args.cache_policy is not None:
+        return cli_args.cache_policy
+    # pages kept forever would never show a watcher any change
+    if cli_args.watch or cli_args.serve:
+        return REVALIDATE_CACHE_POLICY
+    return KEEP_CACHE_POLICY
+
+
+def watch_intervals(cli_args, modes):
+    intervals = dict(cli_args.interval or ())
+    default = intervals.pop(None, WATCH_INTERVAL)
+    return {mode: intervals.get(mode, default) for mode in modes}
+
+
+def configure_cache(cli_args):
+    settings = configure_backend(cli_args)
+    urls_expire_after = dict(cli_args.ttl or ())
+    if cache_policy(cli_args) == KEEP_CACHE_POLICY:
+        return dict(
+            settings,
+            expire_after=NEVER_EXPIRE,
+            urls_expire_after=urls_expire_after
+        )
+    # stale entries are kept and revalidated with If-None-Match
+    # and If-Modified-Since, so an unchanged page costs a bodyless 304
+    for pattern, expire_after in URLS_EXPIRE_AFTER.items():
+        urls_expire_after.setdefault(pattern, expire_after)
+    return dict(
+        settings,
+        expire_after=EXPIRE_AFTER,
+        urls_expire_after=urls_expire_after
+    )
+
+
+def configure_session(cli_args, modes=1):
+    pool_size = cli_args.pool_size
+    if pool_size is None:
+        # modes running at once share the pools of one session
+        pool_size = cli_args.workers * (
+            modes if cli_args.concurrent_modes else 1
+        )
+    return dict(
+        configure_cache(cli_args),
+        pool_size=pool_size,
+        timeouts=(cli_args.connect_timeout, cli_args.read_timeout),
+        replay=cli_args.replay is not None
+    )
+
+
 def configure_logging():
     LOG_DIR.mkdir(exist_ok=True)
     rotating_handler = RotatingFileHandler(
@@ -3,21 +3,95 @@ from pathlib import Path
 # PEP web resources
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 PEP_URL = 'https://peps.python.org/'
+PEP_JSON_PATH = 'api/peps.json'
 
 # file routing and management
 BASE_DIR = Path(__file__).parent
 DOWNLOADS_DIR = BASE_DIR / 'downloads'
 RESULTS_DIR = BASE_DIR / 'results'
+SNAPSHOTS_DIR = BASE_DIR / 'snapshots'
+PEP_SNAPSHOT = 'pep.json'
+WHATS_NEW_SNAPSHOT = 'whats_new.json'
 FILE_NAME = '{parser_mode}_{now}.csv'
 LOG_DIR = BASE_DIR / 'logs'
 LOG_FILE = LOG_DIR / 'parser.log'
 DATETIME_FORMAT = '%Y-%m-%d_%H-%M-%S'
 RESULTS = 'results'
 DOWNLOADS = 'downloads'
+METRICS = 'metrics'
+METRICS_FILE_NAME = '{parser_mode}_{now}.{extension}'
+CHUNK_SIZE = 64 * 1024
+CACHE_DIR = BASE_DIR / 'cache'
+HTTP_CACHE = CACHE_DIR / 'http_cache'
+EXTRACTS_DB = CACHE_DIR / 'extracts.sqlite'
+EXTRACTS_MAX_ENTRIES = 10000
+STORE = 'store'
+PEP_HISTORY_DB = BASE_DIR / STORE / 'pep_history.sqlite'
+RESULTS_DB = 'results.sqlite'
+PARQUET = 'parquet'
+PARQUET_FILE_NAME = '{now}.parquet'
+STORE_BATCH_SIZE = 500
+ARCHIVE_COMPRESSION = 6  # zlib level of recorded response bodies
 
 # command line parsing
+ALL_MODES = 'all'
+CACHE_MODE = 'cache'
+PEP_CHANGES_MODE = 'pep-changes'
+# columns keying a row in the results database, the first one by default;
+# a PEP has a row per event and run in pep-changes
+ROW_KEY_COLUMNS = {PEP_CHANGES_MODE: (0, 1, 4)}
 NICE_CONSOLE_OUTPUT_KEY = 'pretty'
 EXPORT_OUTPUT_KEY = 'file'
+SQLITE_OUTPUT_KEY = 'sqlite'
+PARQUET_OUTPUT_KEY = 'parquet'
+JSON_METRICS_KEY = 'json'
+PROMETHEUS_METRICS_KEY = 'prometheus'
+JSON_PEP_SOURCE = 'json'
+HTML_PEP_SOURCE = 'html'
+
+# concurrency
+WORKERS = 8
+PARSE_PROCESSES = 1
+
+# connection pools, timeouts are in seconds
+POOL_HOSTS = 10
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+KEEPALIVE_TIMEOUT = 30
+ENV_PREFIX = 'BS4_PARSER_'
+
+# fetch throttling, the rate is in requests per second to one host
+RATE_LIMIT = 20
+RETRIES = 3
+BACKOFF = 0.5
+MAX_RETRY_DELAY = 60
+RETRY_STATUSES = (429, 502, 503, 504)
+
+# response caching, TTLs are in seconds, -1 means never expire
+KEEP_CACHE_POLICY = 'keep'
+REVALIDATE_CACHE_POLICY = 'revalidate'
+SQLITE_BACKEND = 'sqlite'
+FILESYSTEM_BACKEND = 'filesystem'
+MEMORY_BACKEND = 'memory'
+NEVER_EXPIRE = -1
+EXPIRE_AFTER = 24 * 60 * 60
+URLS_EXPIRE_AFTER = {  # first matching pattern wins
+    'peps.python.org/pep-*': EXPIRE_AFTER,
+    'peps.python.org/': 60 * 60,
+    'docs.python.org/3/whatsnew/2.*': NEVER_EXPIRE,
+    'docs.python.org/3/whatsnew/3.?.html': NEVER_EXPIRE,
+}
+
+# watch mode, seconds between polls of a mode and between stop checks
+WATCH_INTERVAL = 300
+WATCH_TICK = 1
+
+# serve mode, results of the modes as JSON on a local address
+SERVE_HOST = '127.0.0.1'
+SERVE_RETRY_AFTER = 5
+
+# What's New pages of the newest versions are still edited
+LIVE_VERSIONS = 2
 
 # PEP parsing logic
 EXPECTED_STATUS = {  # should be plural
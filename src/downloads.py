@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+
+from requests import RequestException
+
+from constants import CHUNK_SIZE
+from metrics import registry
+from utils import LOAD_ERROR_MESSAGE, archive_response
+
+# skips both reading and writing the session cache, unlike
+# cache_disabled() it does not affect other threads using the session
+NO_STORE = {'Cache-Control': 'no-store'}
+PART_SUFFIX = '.part'
+META_SUFFIX = '.meta.json'
+UP_TO_DATE_MESSAGE = 'Архив уже загружен и не изменился: {}'
+RESUME_MESSAGE = 'Загрузка архива продолжена с байта {}: {}'
+RESTART_MESSAGE = 'Недокачанный файл длиннее архива, загрузка заново: {}'
+
+
+def file_checksum(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def remote_meta(session, url):
+    try:
+        response = session.head(url, allow_redirects=True, headers=NO_STORE)
+    except RequestException as e:
+        raise ConnectionError(LOAD_ERROR_MESSAGE.format(url, e))
+    archive_response(url, response, method='HEAD', body=b'')
+    size = response.headers.get('Content-Length')
+    return {
+        'etag': response.headers.get('ETag'),
+        'size': int(size) if size is not None else None,
+    }
+
+
+def is_up_to_date(path, remote):
+    meta_path = path.with_name(path.name + META_SUFFIX)
+    if not path.exists() or not meta_path.exists():
+        return False
+    local = json.loads(meta_path.read_text(encoding='utf-8'))
+    if path.stat().st_size != local['size']:
+        return False
+    if remote['etag'] is not None:
+        if remote['etag'] != local['etag']:
+            return False
+    elif remote['size'] != local['size']:
+        return False
+    return file_checksum(path) == local['sha256']
+
+
+def stream_to_file(session, url, part_path, remote):
+    offset = part_path.stat().st_size if part_path.exists() else 0
+    if remote['size'] and offset >= remote['size']:
+        # a complete part left by a crash before the rename: asking for
+        # its last byte again lets If-Range confirm it is still current
+        offset = remote['size'] - 1
+    headers = dict(NO_STORE)
+    if offset and remote['etag'] is not None:
+        # If-Range makes the server send the whole file if it has changed
+        headers.update(
+            {'Range': f'bytes={offset}-', 'If-Range': remote['etag']}
+        )
+    try:
+        with registry.timer('download'), session.get(
+            url, headers=headers, stream=True
+        ) as response:
+            restart = response.status_code == 416 and 'Range' in headers
+            if not restart:
+                write_response(url, response, part_path, offset)
+    except RequestException as e:
+        registry.inc('fetch_errors')
+        raise ConnectionError(LOAD_ERROR_MESSAGE.format(url, e))
+    if restart:
+        # the range is past the end of the file, the part is not usable
+        logging.warning(RESTART_MESSAGE.format(part_path))
+        part_path.unlink()
+        stream_to_file(session, url, part_path, remote)
+
+
+def write_response(url, response, part_path, offset):
+    response.raise_for_status()
+    resumed = response.status_code == 206
+    if resumed:
+        logging.info(RESUME_MESSAGE.format(offset, url))
+    with open(part_path, 'r+b' if resumed else 'wb') as file:
+        if resumed:
+            file.seek(offset)
+            file.truncate()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            file.write(chunk)
+            registry.inc('bytes_transferred', len(chunk))
+    # a resumed response is only the tail, it cannot be replayed
+    if not resumed:
+        archive_response(url, response, path=part_path)
+
+
+def download_file(session, url, path):
+    """Скачивает файл по частям, не сохраняя его в кеш сессии.
+
+    Возвращает False, если локальная копия совпадает с файлом на сервере.
+    """
+    remote = remote_meta(session, url)
+    if is_up_to_date(path, remote):
+        logging.info(UP_TO_DATE_MESSAGE.format(path))
+        return False
+    part_path = path.with_name(path.name + PART_SUFFIX)
+    stream_to_file(session, url, part_path, remote)
+    part_path.replace(path)
+    path.with_name(path.name + META_SUFFIX).write_text(json.dumps({
+        'etag': remote['etag'],
+        'size': path.stat().st_size,
+        'sha256': file_checksum(path),
+    }), encoding='utf-8')
+    return True
@@ -0,0 +1,153 @@
+from collections import deque
+from threading import Lock
+import hashlib
+import json
+import pickle
+import sqlite3
+import time
+
+from constants import EXTRACTS_MAX_ENTRIES
+from metrics import registry
+
+MISSING = object()
+CREATE_TABLE = '''CREATE TABLE IF NOT EXISTS extracts (
+    key TEXT PRIMARY KEY,
+    result BLOB NOT NULL,
+    accessed REAL NOT NULL
+)'''
+
+
+def extractor(version):
+    """Помечает функцию разбора страницы версией для кеша извлечений.
+
+    Версию нужно поднимать при каждом изменении того, что функция
+    извлекает, иначе из кеша вернутся записи старого формата.
+    """
+    def decorate(extract):
+        extract.extractor_version = version
+        return extract
+    return decorate
+
+
+def page_key(extract, source, text):
+    digest = hashlib.sha256()
+    for part in (
+        extract.__qualname__,
+        str(extract.extractor_version),
+        json.dumps(source, sort_keys=True),
+        text,
+    ):
+        digest.update(part.encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ExtractCache:
+    """Записи, извлечённые из страниц, ключ - адрес, версия и содержимое.
+
+    Неизменившаяся страница не разбирается повторно, даже если её тело
+    пришлось загрузить заново. Хранит не больше max_entries записей,
+    вытесняя самые давно прочитанные.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.connection = None
+        self.max_entries = EXTRACTS_MAX_ENTRIES
+
+    def open(self, path, max_entries=EXTRACTS_MAX_ENTRIES):
+        self.close()
+        path.parent.mkdir(exist_ok=True)
+        # extraction may run in the threads of concurrent modes
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(CREATE_TABLE)
+        self.max_entries = max_entries
+
+    def close(self):
+        if self.connection is None:
+            return
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
+            self.connection = None
+
+    def caches(self, extract):
+        if self.connection is None:
+            return False
+        return hasattr(extract, 'extractor_version')
+
+    def clear(self):
+        with self.lock:
+            self.connection.execute('DELETE FROM extracts')
+            self.connection.commit()
+
+    def get(self, key):
+        with self.lock:
+            row = self.connection.execute(
+                'SELECT result FROM extracts WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                registry.inc('extract_cache_misses')
+                return MISSING
+            self.connection.execute(
+                'UPDATE extracts SET accessed = ? WHERE key = ?',
+                (time.time(), key)
+            )
+        registry.inc('extract_cache_hits')
+        return pickle.loads(row[0])
+
+    def set(self, key, result):
+        with self.lock:
+            self.connection.execute(
+                'INSERT OR REPLACE INTO extracts VALUES (?, ?, ?)',
+                (key, pickle.dumps(result), time.time())
+            )
+
+    def evict(self):
+        if self.connection is None:
+            return
+        with self.lock:
+            self.connection.execute(
+                'DELETE FROM extracts WHERE key NOT IN ('
+                'SELECT key FROM extracts ORDER BY accessed DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+            self.connection.commit()
+
+    def extract_pages(self, extract, pages, parse):
+        """Берёт записи из кеша, а parse отдаёт только остальные страницы.
+
+        Порядок записей совпадает с порядком страниц, сами страницы
+        читаются лениво, поэтому вывод режима не ждёт всех загрузок.
+        """
+        pending = deque()
+        parsed = deque()
+
+        def misses():
+            for source, text in pages:
+                key = page_key(extract, source, text)
+                result = self.get(key)
+                pending.append((key, result))
+                if result is MISSING:
+                    yield source, text
+
+        results = parse(misses())
+        try:
+            while True:
+                while pending and (pending[0][1] is not MISSING or parsed):
+                    key, result = pending.popleft()
+                    if result is MISSING:
+                        result = parsed.popleft()
+                        self.set(key, result)
+                    yield result
+                result = next(results, MISSING)
+                if result is MISSING:
+                    # every page is read, only cached results are left
+                    yield from (result for _, result in pending)
+                    return
+                parsed.append(result)
+        finally:
+            self.evict()
+
+
+extract_cache = ExtractCache()
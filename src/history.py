@@ -0,0 +1,126 @@
+from threading import Lock
+import datetime as dt
+import sqlite3
+
+from constants import DATETIME_FORMAT
+
+CREATE_TABLES = '''
+CREATE TABLE IF NOT EXISTS runs (
+    run TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS current (
+    number INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    preview_status TEXT NOT NULL,
+    actual_status TEXT NOT NULL,
+    run TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transitions (
+    run TEXT NOT NULL,
+    number INTEGER NOT NULL,
+    old_status TEXT,
+    new_status TEXT NOT NULL,
+    PRIMARY KEY (run, number)
+);
+CREATE INDEX IF NOT EXISTS current_mismatches ON current (number)
+    WHERE preview_status != actual_status;
+'''
+CHANGES_QUERY = (
+    'SELECT number, old_status, new_status, run '
+    'FROM transitions WHERE run >= ? ORDER BY run, number'
+)
+MISMATCHES_QUERY = (
+    'SELECT number, preview_status, actual_status, run '
+    'FROM current WHERE preview_status != actual_status '
+    'ORDER BY number'
+)
+
+
+def run_id():
+    return dt.datetime.now().strftime(DATETIME_FORMAT)
+
+
+class PepHistory:
+    """История статусов PEP между запусками.
+
+    Хранит последнее известное состояние каждого PEP и смены статуса
+    с меткой запуска, в котором они замечены. Метки запусков
+    сравниваются как строки, поэтому дата отбирает все запуски с неё.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.connection = None
+
+    def open(self, path):
+        self.close()
+        path.parent.mkdir(exist_ok=True)
+        # pep may run in a thread of concurrent modes
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.executescript(CREATE_TABLES)
+
+    def close(self):
+        if self.connection is None:
+            return
+        with self.lock:
+            self.connection.close()
+            self.connection = None
+
+    def record(self, peps, run=None):
+        """Запоминает статусы PEP и возвращает число смен статуса.
+
+        PEP, карточки которых не загрузились, просто не обновляются.
+        Неизвестный статус каталога (JSON-источник) считается равным
+        статусу карточки и несовпадением не становится.
+        """
+        if self.connection is None:
+            return 0
+        run = run or run_id()
+        with self.lock, self.connection:
+            known = dict(self.connection.execute(
+                'SELECT number, actual_status FROM current'
+            ))
+            transitions = [
+                (run, int(pep.number), known.get(int(pep.number)),
+                 pep.actual_status)
+                for pep in peps
+                if known.get(int(pep.number)) != pep.actual_status
+            ]
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO transitions VALUES (?, ?, ?, ?)',
+                transitions
+            )
+            self.connection.executemany(
+                'INSERT OR REPLACE INTO current VALUES (?, ?, ?, ?, ?)',
+                (
+                    (int(pep.number), pep.url,
+                     pep.preview_status or pep.actual_status,
+                     pep.actual_status, run)
+                    for pep in peps
+                )
+            )
+            self.connection.execute(
+                'INSERT OR IGNORE INTO runs VALUES (?)', (run,)
+            )
+        return len(transitions)
+
+    def latest_run(self):
+        with self.lock:
+            return self.connection.execute(
+                'SELECT MAX(run) FROM runs'
+            ).fetchone()[0]
+
+    def changes(self, since=None):
+        """Смены статуса с запуска или даты since, иначе с последнего."""
+        since = since or self.latest_run() or ''
+        with self.lock:
+            return self.connection.execute(
+                CHANGES_QUERY, (since,)
+            ).fetchall()
+
+    def mismatches(self):
+        with self.lock:
+            return self.connection.execute(MISMATCHES_QUERY).fetchall()
+
+
+pep_history = PepHistory()
@@ -0,0 +1,208 @@
+from contextlib import contextmanager
+from threading import Lock
+import os
+import time
+
+from requests_cache import FileCache, SQLiteCache
+
+from metrics import registry
+
+CREATE_ACCESS_TABLE = '''CREATE TABLE IF NOT EXISTS access (
+    key TEXT PRIMARY KEY,
+    accessed REAL NOT NULL
+)'''
+
+
+class AccessLog:
+    """Когда читались записи кеша HTTP за этот запуск.
+
+    По этим отметкам при превышении размера вытесняются записи,
+    которые дольше всех не читались.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.times = {}
+
+    def touch(self, key):
+        if key is None:
+            return
+        with self.lock:
+            self.times[key] = time.time()
+
+    def flush(self, cache):
+        with self.lock:
+            times, self.times = self.times, {}
+        backend(cache)['touch'](cache, times)
+
+
+access_log = AccessLog()
+
+
+class Revalidation:
+    """Адреса, уже перепроверенные у сервера за текущий опрос.
+
+    В долгоживущем процессе запись кеша свежа до суток, поэтому
+    каждый опрос один раз перепроверяет каждую страницу условным
+    запросом, не дожидаясь её устаревания.
+    """
+
+    def __init__(self):
+        self.lock = Lock()
+        self.urls = set()
+        self.active = False
+
+    @contextmanager
+    def poll(self):
+        self.active = True
+        try:
+            yield self
+        finally:
+            self.active = False
+            self.urls.clear()
+
+    def needed(self, url):
+        if not self.active:
+            return False
+        with self.lock:
+            if url in self.urls:
+                return False
+            self.urls.add(url)
+            return True
+
+
+revalidation = Revalidation()
+
+
+def sqlite_touch(cache, times):
+    with cache.responses.connection(commit=True) as connection:
+        connection.execute(CREATE_ACCESS_TABLE)
+        connection.executemany(
+            'INSERT OR REPLACE INTO access VALUES (?, ?)', times.items()
+        )
+
+
+def sqlite_entries(cache):
+    with cache.responses.connection(commit=True) as connection:
+        connection.execute(CREATE_ACCESS_TABLE)
+        return connection.execute(
+            'SELECT r.key, LENGTH(r.value), COALESCE(a.accessed, 0) '
+            f'FROM {cache.responses.table_name} AS r '
+            'LEFT JOIN access AS a ON a.key = r.key'
+        ).fetchall()
+
+
+def sqlite_checkpoint(cache):
+    # in WAL mode recent pages, the vacuumed copy too, sit in the -wal file;
+    # inside requests-cache's write transaction the checkpoint is a no-op
+    with cache.responses.connection() as connection:
+        connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+
+def sqlite_size(cache):
+    sqlite_checkpoint(cache)
+    return cache.responses.size()
+
+
+def sqlite_vacuum(cache):
+    with cache.responses.connection(commit=True) as connection:
+        connection.execute(CREATE_ACCESS_TABLE)
+        connection.execute(
+            'DELETE FROM access WHERE key NOT IN '
+            f'(SELECT key FROM {cache.responses.table_name})'
+        )
+    cache.responses.vacuum()
+    sqlite_checkpoint(cache)
+
+
+def file_touch(cache, times):
+    responses = cache.responses
+    for key, accessed in times.items():
+        path = responses.cache_dir / f'{key}{responses.extension}'
+        if path.exists():
+            os.utime(path, (accessed, accessed))
+
+
+def file_entries(cache):
+    entries = []
+    for path in cache.responses.paths():
+        stat = path.stat()
+        key = path.name[:len(path.name) - len(cache.responses.extension)]
+        entries.append((key, stat.st_size, stat.st_mtime))
+    return entries
+
+
+def memory_entries(cache):
+    # nothing outlives the process, entries go in insertion order
+    return [
+        (key, len(response.content or b''), 0)
+        for key, response in cache.responses.items()
+    ]
+
+
+def memory_size(cache):
+    return sum(size for _, size, _ in memory_entries(cache))
+
+
+def file_size(cache):
+    return cache.responses.size()
+
+
+def skip(cache, *args):
+    pass
+
+
+MEMORY_BACKEND = {
+    'touch': skip,
+    'entries': memory_entries,
+    'vacuum': skip,
+    'size': memory_size,
+}
+BACKENDS = {
+    SQLiteCache: {
+        'touch': sqlite_touch,
+        'entries': sqlite_entries,
+        'vacuum': sqlite_vacuum,
+        'size': sqlite_size,
+    },
+    FileCache: {
+        'touch': file_touch,
+        'entries': file_entries,
+        'vacuum': skip,
+        'size': file_size,
+    },
+}
+
+
+def backend(cache):
+    return BACKENDS.get(type(cache), MEMORY_BACKEND)
+
+
+def cache_size(cache):
+    return backend(cache)['size'](cache)
+
+
+def prune_expired(cache):
+    before = len(cache.responses)
+    cache.delete(expired=True)
+    return before - len(cache.responses)
+
+
+def evict(cache, max_bytes):
+    """Удаляет давно не читавшиеся записи, пока кеш больше max_bytes."""
+    entries = sorted(backend(cache)['entries'](cache), key=lambda e: e[2])
+    total = sum(size for _, size, _ in entries)
+    victims = []
+    for key, size, _ in entries:
+        if total <= max_bytes:
+            break
+        victims.append(key)
+        total -= size
+    if victims:
+        cache.delete(*victims)
+        registry.inc('cache_evictions', len(victims))
+    return len(victims)
+
+
+def vacuum(cache):
+    backend(cache)['vacuum'](cache)
@@ -0,0 +1,39 @@
+import importlib
+
+
+class Lazy:
+    """Модуль или его атрибут, импортируемый при первом обращении.
+
+    Тяжёлые зависимости загружают только режимы, которым они нужны,
+    поэтому --help, ошибки аргументов и лёгкие режимы запускаются быстро.
+    """
+
+    def __init__(self, module, name=None):
+        self.module = module
+        self.name = name
+
+    def resolve(self):
+        module = importlib.import_module(self.module)
+        if self.name is None:
+            return module
+        return getattr(module, self.name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __getattr__(self, attr):
+        return getattr(self.resolve(), attr)
+
+
+def lazy_import(module):
+    return Lazy(module)
+
+
+def lazy_from(module, *names):
+    """Отложенный from module import names.
+
+    Как operator.itemgetter, для одного имени возвращает одно значение,
+    для нескольких - кортеж.
+    """
+    attributes = tuple(Lazy(module, name) for name in names)
+    return attributes[0] if len(attributes) == 1 else attributes
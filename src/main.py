@@ -1,66 +1,84 @@
+from argparse import Namespace
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from urllib.parse import urljoin
 import logging
-import re
 
-from requests_cache import CachedSession
-from tqdm import tqdm
-from tqdm.contrib.logging import logging_redirect_tqdm
+from archive import http_archive
+from configs import (configure_argument_parser, configure_logging,
+                     configure_session, watch_intervals)
+from constants import (ALL_MODES, BASE_DIR, CACHE_MODE, DOWNLOADS,
+                       EXTRACTS_DB, HTML_PEP_SOURCE, JSON_PEP_SOURCE,
+                       LIVE_VERSIONS, MAIN_DOC_URL, NEVER_EXPIRE,
+                       PARSE_PROCESSES, PEP_CHANGES_MODE, PEP_HISTORY_DB,
+                       PEP_JSON_PATH, PEP_SNAPSHOT, PEP_URL, SNAPSHOTS_DIR,
+                       WHATS_NEW_SNAPSHOT, WORKERS)
+from extracts import extract_cache, extractor
+from history import pep_history
+from lazy import lazy_from, lazy_import
+from metrics import dump_metrics, registry
+from snapshots import load_snapshot, save_snapshot
+from specs import (DOWNLOAD_ARCHIVE, LATEST_VERSIONS, WHATS_NEW_INDEX,
+                   WHATS_NEW_VERSION)
+from watch import Watcher
 
-from configs import configure_argument_parser, configure_logging
-from constants import BASE_DIR, DOWNLOADS, MAIN_DOC_URL, PEP_URL
-from outputs import control_output
-from utils import find_tag, make_soup
+# fetching, parsing and output stacks are imported by the modes using them
+asyncio = lazy_import('asyncio')
+tqdm = lazy_from('tqdm', 'tqdm')
+tqdm_asyncio = lazy_from('tqdm.asyncio', 'tqdm_asyncio')
+logging_redirect_tqdm = lazy_from(
+    'tqdm.contrib.logging', 'logging_redirect_tqdm'
+)
+async_client, get_response_async, make_tree_async = lazy_from(
+    'async_utils', 'async_client', 'get_response_async', 'make_tree_async'
+)
+download_file = lazy_from('downloads', 'download_file')
+(access_log, cache_size, evict, prune_expired, revalidation,
+ vacuum) = lazy_from(
+    'http_cache', 'access_log', 'cache_size', 'evict', 'prune_expired',
+    'revalidation', 'vacuum'
+)
+control_output = lazy_from('outputs', 'control_output')
+(fetch_card_async, fetch_json_index, fetch_json_index_async, fill_peps,
+ known_peps, load_peps, parse_index) = lazy_from(
+    'peps', 'fetch_card_async', 'fetch_json_index', 'fetch_json_index_async',
+    'fill_peps', 'known_peps', 'load_peps', 'parse_index'
+)
+ResultServer, ResultTables = lazy_from(
+    'serve', 'ResultServer', 'ResultTables'
+)
+make_session, session_timeouts = lazy_from(
+    'sessions', 'make_session', 'session_timeouts'
+)
+throttle = lazy_from('throttle', 'throttle')
+extract_pages, get_response, make_tree, parse_tree = lazy_from(
+    'utils', 'extract_pages', 'get_response', 'make_tree', 'parse_tree'
+)
 
 START = 'Парсер запущен!'
 FINISH = 'Парсер завершил работу.'
 DOWNLOAD_SUCCESS_MESSAGE = 'Архив был загружен и сохранён: {}'
 FAILURE_MESSAGE = 'Аварийный выход: {}'
-MISMATCH_MESSAGE = ('Несовпадающий статус:\n{}\n'
-                    'Статус в карточке: {}\n'
-                    'Статус в каталоге: {}')
-SEARCH_ERROR = 'Ничего не нашлось'
+MODE_FAILURE_MESSAGE = 'Режим {} завершился с ошибкой: {}'
+NOT_SERVED_MESSAGE = 'Режим {} не возвращает таблицу и не будет опрашиваться'
+NOTHING_TO_SERVE = 'Среди выбранных режимов нет возвращающих таблицу'
 SINGLE_PEP_LOAD_ERROR = 'PEP не прогрузился: {}'
 SINGLE_VERSION_LOAD_ERROR = 'Карточка версии не прогрузилась: {}'
+INCREMENTAL_MESSAGE = 'Карточек PEP из снимка: {}, загружено заново: {}'
+DELTA_MESSAGE = 'Страниц версий из снимка: {}, загружено заново: {}'
+HISTORY_MESSAGE = 'Смен статуса PEP записано в историю: {}'
+NO_PREVIEW_MESSAGE = ('В JSON-каталоге нет статусов каталога, несовпадения '
+                      'с карточками проверяются только с --pep-source html')
+PEP_CHANGES_HEADER = ('PEP', 'Событие', 'Было', 'Стало', 'Запуск')
+NEW_PEP_EVENT = 'Новый PEP'
+TRANSITION_EVENT = 'Смена статуса'
+MISMATCH_EVENT = 'Каталог/карточка'
+WHATS_NEW_URL = urljoin(MAIN_DOC_URL, 'whatsnew/')
+WHATS_NEW_HEADER = ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
 
 
-class Pep:
-    def __init__(self, row=None, session=None):
-        a_tag = find_tag(row, 'a')
-        self.number = a_tag.text
-        self.url = urljoin(PEP_URL, find_tag(row, 'a')['href'])
-        self.preview_status = find_tag(row, 'abbr')['title'].split(', ')[-1]
-        soup = make_soup(session, self.url)
-        for dt in soup.find_all('dt'):
-            if dt.text == 'Status:':
-                self.actual_status = dt.next_sibling.next_sibling.string
-                # next twice, because first next is an empty line
-        if self.preview_status != self.actual_status:
-            logging.info(MISMATCH_MESSAGE.format(
-                self.url,
-                self.actual_status,
-                self.preview_status
-            ))
-
-    def __str__(self):
-        return (f'{self.number}:{self.preview_status}/'
-                f'{self.actual_status}[{self.url}]')
-
-
-def pep(session):
-    with logging_redirect_tqdm():
-        peps = []
-        for row in tqdm(find_tag(
-            find_tag(
-                make_soup(session, PEP_URL),
-                id="numerical-index"
-            ),
-            'tbody',
-        ).find_all('tr')):
-            try:
-                peps.append(Pep(row, session))
-            except ConnectionError as e:
-                logging.exception(e)
+def pep_summary(peps):
     counter = Counter(pep.actual_status for pep in peps)
     return [
         ('Status', 'Number of PEPs'),
@@ -69,94 +87,559 @@ def pep(session):
     ]
 
 
-def whats_new(session):
-    whats_new_url = urljoin(MAIN_DOC_URL, 'whatsnew/')
-    results = [('Ссылка на статью', 'Заголовок', 'Редактор, Автор')]
+def pep_snapshot(incremental):
+    if not incremental:
+        return None
+    return load_snapshot(SNAPSHOTS_DIR / PEP_SNAPSHOT)
+
+
+def update_pep_snapshot(peps, snapshot):
+    if snapshot is None:
+        return
+    reused = sum(snapshot.get(pep.url) == pep._asdict() for pep in peps)
+    logging.info(INCREMENTAL_MESSAGE.format(reused, len(peps) - reused))
+    save_snapshot(
+        SNAPSHOTS_DIR / PEP_SNAPSHOT,
+        {pep.url: pep._asdict() for pep in peps}
+    )
+
+
+def record_pep_history(peps):
+    if any(pep.preview_status is None for pep in peps):
+        logging.info(NO_PREVIEW_MESSAGE)
+    if pep_history.connection is not None:
+        logging.info(HISTORY_MESSAGE.format(pep_history.record(peps)))
+
+
+def pep_changes(session, since=None, **kwargs):
+    """Смены статуса PEP из истории и несовпадения каталога с карточками.
+
+    Ничего не загружает, отвечает по индексам базы истории.
+    """
+    return [
+        PEP_CHANGES_HEADER,
+        *(
+            (
+                number,
+                TRANSITION_EVENT if old else NEW_PEP_EVENT,
+                old or '',
+                new,
+                run
+            )
+            for number, old, new, run in pep_history.changes(since)
+        ),
+        *(
+            (number, MISMATCH_EVENT, preview, actual, run)
+            for number, preview, actual, run in pep_history.mismatches()
+        ),
+    ]
+
+
+def pep_sources(pep_source):
+    # scraping the cards is the fallback of every other source
+    return dict.fromkeys((pep_source, HTML_PEP_SOURCE))
+
+
+def json_source(session, **kwargs):
+    return fetch_json_index(session, urljoin(PEP_URL, PEP_JSON_PATH))
+
+
+def html_source(session, workers, snapshot, processes):
+    index = parse_index(get_response(session, PEP_URL).text, PEP_URL)
+    return load_peps(session, index, workers, snapshot, processes)
+
+
+def pep(
+    session,
+    workers=WORKERS,
+    incremental=False,
+    parse_processes=PARSE_PROCESSES,
+    pep_source=JSON_PEP_SOURCE,
+    **kwargs
+):
+    snapshot = pep_snapshot(incremental)
     with logging_redirect_tqdm():
-        for a_tag in tqdm(make_soup(session, whats_new_url).select(
-            '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 > a'
-        )):
-            version_link = urljoin(
-                whats_new_url,
-                a_tag['href']
+        for source in pep_sources(pep_source):
+            peps = PEP_SOURCES[source](
+                session, workers=workers, snapshot=snapshot,
+                processes=parse_processes
             )
-            try:
-                soup = make_soup(session, version_link)
-                results.append((
-                    version_link,
-                    find_tag(soup, 'h1').text,
-                    find_tag(soup, 'dl').text.replace(
-                        '\n',
-                        ' '
-                    ).encode('utf-8')
-                ))
-            except ConnectionError as e:
-                logging.exception(SINGLE_VERSION_LOAD_ERROR.format(e))
-    return results
+            if peps is not None:
+                break
+        update_pep_snapshot(peps, snapshot)
+    record_pep_history(peps)
+    return pep_summary(peps)
 
 
-def latest_versions(session):
-    for ul in make_soup(session, MAIN_DOC_URL).select(
-        'div.sphinxsidebarwrapper ul'
-    ):
-        if 'All versions' in ul.text:
-            a_tags = ul.find_all('a')
-            break
-    else:
-        raise LookupError(SEARCH_ERROR)
-    results = [('Ссылка на документацию', 'Версия', 'Статус')]
-    pattern = r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
-    for a_tag in a_tags:
-        match = re.search(pattern, a_tag.text)
-        if match:
-            version, status = match.groups()
-        else:
-            version, status = a_tag.text, ''
-        results.append((a_tag['href'], version, status))
-    return results
+async def json_source_async(client, session, **kwargs):
+    return await fetch_json_index_async(
+        client, session, urljoin(PEP_URL, PEP_JSON_PATH)
+    )
+
+
+async def html_source_async(client, session, snapshot, processes):
+    index = parse_index(
+        (await get_response_async(client, session, PEP_URL)).text,
+        PEP_URL
+    )
+    peps, missing = known_peps(index, snapshot)
+    texts = await tqdm_asyncio.gather(*(
+        fetch_card_async(client, session, index[number]['url'])
+        for number in missing
+    ))
+    return fill_peps(index, peps, missing, texts, processes)
+
+
+async def collect_peps_async(
+    session, workers, snapshot=None, processes=1, pep_source=JSON_PEP_SOURCE
+):
+    async with async_client(
+        workers, session_timeouts(session)
+    ) as client:
+        for source in pep_sources(pep_source):
+            peps = await ASYNC_PEP_SOURCES[source](
+                client, session, snapshot=snapshot, processes=processes
+            )
+            if peps is not None:
+                return peps
+
+
+def pep_async(
+    session,
+    workers=WORKERS,
+    incremental=False,
+    parse_processes=PARSE_PROCESSES,
+    pep_source=JSON_PEP_SOURCE,
+    **kwargs
+):
+    snapshot = pep_snapshot(incremental)
+    with logging_redirect_tqdm():
+        peps = asyncio.run(collect_peps_async(
+            session, workers, snapshot, parse_processes, pep_source
+        ))
+        update_pep_snapshot(peps, snapshot)
+    record_pep_history(peps)
+    return pep_summary(peps)
+
+
+def version_links(tree):
+    return [
+        urljoin(WHATS_NEW_URL, link['href'])
+        for link in WHATS_NEW_INDEX.extract_all(tree)
+    ]
+
+
+def version_info(version_link, tree):
+    with registry.timer('extract_whats_new'):
+        fields = WHATS_NEW_VERSION.extract(tree)
+        return (
+            version_link,
+            fields['title'],
+            fields['editors'].replace('\n', ' ').encode('utf-8')
+        )
+
+
+@extractor(version=2)
+def extract_version(version_link, text):
+    return version_info(version_link, parse_tree(text))
+
+
+def whats_new_snapshot(incremental):
+    if not incremental:
+        return None
+    return load_snapshot(SNAPSHOTS_DIR / WHATS_NEW_SNAPSHOT)
+
+
+def version_row(stored):
+    link, title, editor = stored
+    return (link, title, editor.encode('utf-8'))
 
 
-def download(session):
+def versions_delta(links, snapshot, live_versions):
+    """Делит версии на строки из снимка и страницы, которые нужно загрузить.
+
+    Страницы самых новых live_versions версий ещё правят, поэтому они
+    загружаются всегда. Остальные берутся из снимка, а впервые
+    загруженные хранятся в кеше HTTP бессрочно.
+    """
+    if snapshot is None:
+        return {}, [(link, None) for link in links]
+    live = links[:live_versions]
+    pinned = {
+        link: version_row(snapshot[link])
+        for link in links[live_versions:] if link in snapshot
+    }
+    return pinned, [
+        (link, None if link in live else NEVER_EXPIRE)
+        for link in links if link not in pinned
+    ]
+
+
+def ordered_versions(links, pinned, extracted):
+    # extracted rows keep the toctree order, failed pages are missing
+    extracted = iter(extracted)
+    upcoming = next(extracted, None)
+    for link in links:
+        if link in pinned:
+            yield pinned[link]
+        elif upcoming is not None and upcoming[0] == link:
+            yield upcoming
+            upcoming = next(extracted, None)
+
+
+def update_versions_snapshot(rows, pinned, snapshot):
+    if snapshot is None:
+        return
+    logging.info(DELTA_MESSAGE.format(len(pinned), len(rows) - len(pinned)))
+    save_snapshot(
+        SNAPSHOTS_DIR / WHATS_NEW_SNAPSHOT,
+        {
+            link: [link, title, editor.decode('utf-8')]
+            for link, title, editor in rows
+        }
+    )
+
+
+def fetch_version(session, version_link, expire_after=None):
+    try:
+        return get_response(
+            session, version_link, expire_after=expire_after
+        ).text
+    except ConnectionError as e:
+        logging.exception(SINGLE_VERSION_LOAD_ERROR.format(e))
+
+
+def whats_new(
+    session,
+    parse_processes=PARSE_PROCESSES,
+    incremental=False,
+    live_versions=LIVE_VERSIONS,
+    **kwargs
+):
+    # a failed index must fail the mode before the header reaches the output
+    links = version_links(make_tree(session, WHATS_NEW_URL))
+    snapshot = whats_new_snapshot(incremental)
+    pinned, missing = versions_delta(links, snapshot, live_versions)
+    yield WHATS_NEW_HEADER
+    texts = (
+        fetch_version(session, link, expire_after)
+        for link, expire_after in missing
+    )
+    pages = (
+        (link, text)
+        for (link, _), text in zip(missing, texts) if text is not None
+    )
+    rows = []
+    with logging_redirect_tqdm():
+        for row in ordered_versions(links, pinned, extract_pages(
+            extract_version, tqdm(pages, total=len(missing)), parse_processes
+        )):
+            rows.append(row)
+            yield row
+    update_versions_snapshot(rows, pinned, snapshot)
+
+
+async def fetch_version_async(client, session, version_link, expire_after):
+    try:
+        return (await get_response_async(
+            client, session, version_link, expire_after=expire_after
+        )).text
+    except ConnectionError as e:
+        logging.exception(SINGLE_VERSION_LOAD_ERROR.format(e))
+
+
+async def collect_versions_async(
+    session, workers, snapshot=None, live_versions=LIVE_VERSIONS
+):
+    async with async_client(
+        workers, session_timeouts(session)
+    ) as client:
+        links = version_links(
+            await make_tree_async(client, session, WHATS_NEW_URL)
+        )
+        pinned, missing = versions_delta(links, snapshot, live_versions)
+        texts = await tqdm_asyncio.gather(*(
+            fetch_version_async(client, session, link, expire_after)
+            for link, expire_after in missing
+        ))
+    return links, pinned, [
+        (link, text)
+        for (link, _), text in zip(missing, texts) if text is not None
+    ]
+
+
+def whats_new_async(
+    session,
+    workers=WORKERS,
+    parse_processes=PARSE_PROCESSES,
+    incremental=False,
+    live_versions=LIVE_VERSIONS,
+    **kwargs
+):
+    snapshot = whats_new_snapshot(incremental)
+    with logging_redirect_tqdm():
+        links, pinned, pages = asyncio.run(
+            collect_versions_async(session, workers, snapshot, live_versions)
+        )
+    rows = list(ordered_versions(
+        links, pinned, extract_pages(extract_version, pages, parse_processes)
+    ))
+    update_versions_snapshot(rows, pinned, snapshot)
+    return [WHATS_NEW_HEADER, *rows]
+
+
+def version_statuses(tree):
+    with registry.timer('extract_latest_versions'):
+        versions = LATEST_VERSIONS.extract_all(tree)
+    yield ('Ссылка на документацию', 'Версия', 'Статус')
+    for version in versions:
+        yield (version['href'], version['version'], version['status'])
+
+
+def latest_versions(session, **kwargs):
+    yield from version_statuses(make_tree(session, MAIN_DOC_URL))
+
+
+def download(session, **kwargs):
     downloads_url = urljoin(MAIN_DOC_URL, 'download.html')
     archive_url = urljoin(
         downloads_url,
-        make_soup(session, downloads_url).select_one(
-            r'a[href$=pdf-a4\.zip]'
-        )['href']
+        DOWNLOAD_ARCHIVE.extract(make_tree(session, downloads_url))['href']
     )
     filename = archive_url.split('/')[-1]
     downloads_dir = BASE_DIR / DOWNLOADS
     downloads_dir.mkdir(exist_ok=True)
     archive_path = downloads_dir / filename
-    response = session.get(archive_url)
-    with open(archive_path, 'wb') as file:
-        file.write(response.content)
-    logging.info(DOWNLOAD_SUCCESS_MESSAGE.format(archive_path))
+    if download_file(session, archive_url, archive_path):
+        logging.info(DOWNLOAD_SUCCESS_MESSAGE.format(archive_path))
+
 
+def cache_maintenance(session, cache_max_size=None, **kwargs):
+    cache = session.cache
+    size_before = cache_size(cache)
+    expired = prune_expired(cache)
+    evicted = evict(cache, cache_max_size * 2 ** 20) if cache_max_size else 0
+    vacuum(cache)
+    return [
+        ('Показатель', 'Значение'),
+        ('Хранилище', type(cache).__name__),
+        ('Записей', len(cache.responses)),
+        ('Удалено устаревших', expired),
+        ('Вытеснено', evicted),
+        ('Размер до, байт', size_before),
+        ('Размер после, байт', cache_size(cache)),
+    ]
 
+
+PEP_SOURCES = {
+    JSON_PEP_SOURCE: json_source,
+    HTML_PEP_SOURCE: html_source,
+}
+ASYNC_PEP_SOURCES = {
+    JSON_PEP_SOURCE: json_source_async,
+    HTML_PEP_SOURCE: html_source_async,
+}
 MODE_TO_FUNCTION = {
     'pep': pep,
     'whats-new': whats_new,
     'latest-versions': latest_versions,
     'download': download,
 }
+ASYNC_MODE_TO_FUNCTION = {
+    'pep': pep_async,
+    'whats-new': whats_new_async,
+}
+# not part of all, they do not parse anything
+MAINTENANCE_MODE_TO_FUNCTION = {
+    CACHE_MODE: cache_maintenance,
+    PEP_CHANGES_MODE: pep_changes,
+}
+# answered from local databases, without an HTTP session
+OFFLINE_MODES = (PEP_CHANGES_MODE,)
+HISTORY_MODES = ('pep', PEP_CHANGES_MODE)
+# save a file instead of returning a table, --serve has nothing to show
+TABLELESS_MODES = ('download',)
+
+
+def selected_modes(modes):
+    # 'all' expands in place, other modes named next to it are kept
+    expanded = []
+    for mode in modes:
+        expanded.extend(MODE_TO_FUNCTION if mode == ALL_MODES else (mode,))
+    return list(dict.fromkeys(expanded))
+
+
+def mode_results(session, cli_args, buffered=False):
+    mode_function = MODE_TO_FUNCTION.get(
+        cli_args.mode, MAINTENANCE_MODE_TO_FUNCTION.get(cli_args.mode)
+    )
+    if cli_args.asyncio:
+        mode_function = ASYNC_MODE_TO_FUNCTION.get(
+            cli_args.mode, mode_function
+        )
+    results = mode_function(session, **vars(cli_args))
+    if buffered and results is not None:
+        # rows of modes running at once are printed in the given order
+        results = list(results)
+    return results
+
+
+def output_results(results, cli_args):
+    if results is not None:
+        control_output(results, cli_args)
+
+
+def run_modes(session, modes_args, concurrent=False):
+    """Выполняет режимы по очереди или одновременно.
+
+    Ошибка одного режима не прерывает остальные.
+    """
+    if not concurrent or len(modes_args) == 1:
+        for mode_args in modes_args:
+            try:
+                output_results(mode_results(session, mode_args), mode_args)
+            except Exception as e:
+                logging.exception(
+                    MODE_FAILURE_MESSAGE.format(mode_args.mode, e)
+                )
+        return
+    with ThreadPoolExecutor(len(modes_args)) as executor:
+        futures = [
+            executor.submit(mode_results, session, mode_args, buffered=True)
+            for mode_args in modes_args
+        ]
+        for mode_args, future in zip(modes_args, futures):
+            try:
+                output_results(future.result(), mode_args)
+            except Exception as e:
+                logging.exception(
+                    MODE_FAILURE_MESSAGE.format(mode_args.mode, e)
+                )
+
+
+def open_session(args, modes):
+    throttle.configure(
+        rate=args.rate, concurrency=args.workers, retries=args.retries
+    )
+    if args.record or args.replay:
+        http_archive.open(
+            args.replay or args.record, replay=args.replay is not None
+        )
+    session = make_session(**configure_session(args, len(modes)))
+    if not args.no_extract_cache:
+        extract_cache.open(EXTRACTS_DB)
+    if args.clear_cache:
+        session.cache.clear()
+        if not args.no_extract_cache:
+            extract_cache.clear()
+    return session
+
+
+def flush_session(session, args):
+    access_log.flush(session.cache)
+    http_archive.commit()
+    if args.cache_max_size:
+        evict(session.cache, args.cache_max_size * 2 ** 20)
+
+
+def poll_run(session):
+    return nullcontext() if session is None else revalidation.poll()
+
+
+def mode_poll(session, args):
+    """Опрос режима в долгоживущем процессе с тёплой сессией.
+
+    Кеши HTTP и извлечённых данных живут весь запуск. Каждая страница
+    один раз за опрос перепроверяется условным запросом.
+    """
+    def poll(mode_args):
+        with registry.timer('poll'), poll_run(session):
+            results = mode_results(session, mode_args, buffered=True)
+        if session is not None:
+            flush_session(session, args)
+        return results
+    return poll
+
+
+def poll_schedule(modes_args, args):
+    intervals = watch_intervals(
+        args, [mode_args.mode for mode_args in modes_args]
+    )
+    return [
+        (mode_args, intervals[mode_args.mode]) for mode_args in modes_args
+    ]
+
+
+def watch_modes(session, modes_args, args):
+    """Опрашивает режимы до SIGTERM и выводит изменившиеся строки."""
+    Watcher(
+        poll_schedule(modes_args, args), mode_poll(session, args),
+        output_results
+    ).run()
+
+
+def serve_modes(session, modes_args, args):
+    """Отдаёт результаты режимов по HTTP, пока фоновый опрос их обновляет.
+
+    Читатели получают готовые ответы и никогда не запускают разбор сами.
+    Режимы без таблицы не опрашиваются.
+    """
+    for mode_args in modes_args:
+        if mode_args.mode in TABLELESS_MODES:
+            logging.warning(NOT_SERVED_MESSAGE.format(mode_args.mode))
+    modes_args = [
+        mode_args for mode_args in modes_args
+        if mode_args.mode not in TABLELESS_MODES
+    ]
+    if not modes_args:
+        raise ValueError(NOTHING_TO_SERVE)
+    tables = ResultTables(mode_args.mode for mode_args in modes_args)
+    poll = mode_poll(session, args)
+
+    def refresh(mode_args):
+        tables.publish(mode_args.mode, poll(mode_args))
+
+    with ResultServer(args.serve, tables):
+        # the refresher returns nothing, so nothing is printed
+        Watcher(
+            poll_schedule(modes_args, args), refresh, output_results
+        ).run()
 
 
 def main():
+    arg_parser = configure_argument_parser(
+        (*MODE_TO_FUNCTION, ALL_MODES, *MAINTENANCE_MODE_TO_FUNCTION)
+    )
+    # --help and argument errors exit before logging and the session
+    args = arg_parser.parse_args()
     configure_logging()
     logging.info(START)
-    arg_parser = configure_argument_parser(MODE_TO_FUNCTION.keys())
-    args = arg_parser.parse_args()
+    modes = selected_modes(args.mode)
+    modes_args = [Namespace(**{**vars(args), 'mode': mode}) for mode in modes]
+    session = None
     try:
-        session = CachedSession()
-        if args.clear_cache:
-            session.cache.clear()
-        parser_mode = args.mode
-        results = MODE_TO_FUNCTION[parser_mode](session)
-        if results is not None:
-            control_output(results, args)
+        if args.clear_cache or set(modes) - set(OFFLINE_MODES):
+            session = open_session(args, modes)
+        if set(modes) & set(HISTORY_MODES):
+            pep_history.open(PEP_HISTORY_DB)
+        if args.serve:
+            serve_modes(session, modes_args, args)
+        elif args.watch:
+            watch_modes(session, modes_args, args)
+        else:
+            # modes may yield rows lazily, so the run is timed together
+            # with the output that consumes them
+            with registry.timer('run'):
+                run_modes(session, modes_args, args.concurrent_modes)
+            if session is not None:
+                flush_session(session, args)
     except Exception as e:
         logging.exception(FAILURE_MESSAGE.format(e))
+    extract_cache.close()
+    pep_history.close()
+    http_archive.close()
+    if args.metrics:
+        dump_metrics(Namespace(**{**vars(args), 'mode': '+'.join(modes)}))
     logging.info(FINISH)
 
 
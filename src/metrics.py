@@ -0,0 +1,142 @@
+import datetime as dt
+import json
+import logging
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from threading import Lock
+
+from constants import (BASE_DIR, DATETIME_FORMAT, JSON_METRICS_KEY,
+                       METRICS, METRICS_FILE_NAME, PROMETHEUS_METRICS_KEY)
+
+METRICS_SAVE_MESSAGE = 'Метрики работы парсера были сохранены: {file_path}'
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PROMETHEUS_PREFIX = 'bs4_parser'
+
+
+class Histogram:
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'avg': round(self.sum / self.count, 6) if self.count else 0.0,
+            'buckets': dict(zip(map(str, BUCKETS), self.bucket_counts)),
+        }
+
+
+class Metrics:
+    """Счётчики и гистограммы длительности этапов, общие для потоков."""
+
+    def __init__(self):
+        self.lock = Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.counters = defaultdict(int)
+            self.histograms = defaultdict(Histogram)
+
+    def inc(self, name, value=1):
+        with self.lock:
+            self.counters[name] += value
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            self.histograms[stage].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def record_response(self, response):
+        size = len(response.content or b'')
+        if getattr(response, 'from_cache', False):
+            self.inc('cache_hits')
+            self.inc('bytes_from_cache', size)
+        else:
+            self.inc('cache_misses')
+            self.inc('bytes_transferred', size)
+
+    def to_dict(self):
+        with self.lock:
+            hits = self.counters.get('cache_hits', 0)
+            lookups = hits + self.counters.get('cache_misses', 0)
+            return {
+                'counters': dict(self.counters),
+                'cache_hit_ratio': (
+                    round(hits / lookups, 4) if lookups else None
+                ),
+                'stages': {
+                    stage: histogram.to_dict()
+                    for stage, histogram in self.histograms.items()
+                },
+            }
+
+    def to_prometheus(self):
+        summary = self.to_dict()
+        lines = []
+        for name, value in summary['counters'].items():
+            lines.append(f'# TYPE {PROMETHEUS_PREFIX}_{name}_total counter')
+            lines.append(f'{PROMETHEUS_PREFIX}_{name}_total {value}')
+        if summary['cache_hit_ratio'] is not None:
+            lines.append(f'# TYPE {PROMETHEUS_PREFIX}_cache_hit_ratio gauge')
+            lines.append(
+                f'{PROMETHEUS_PREFIX}_cache_hit_ratio '
+                f'{summary["cache_hit_ratio"]}'
+            )
+        name = f'{PROMETHEUS_PREFIX}_stage_seconds'
+        lines.append(f'# TYPE {name} histogram')
+        for stage, histogram in summary['stages'].items():
+            for bound, count in histogram['buckets'].items():
+                lines.append(
+                    f'{name}_bucket{{stage="{stage}",le="{bound}"}} {count}'
+                )
+            lines.append(
+                f'{name}_bucket{{stage="{stage}",le="+Inf"}} '
+                f'{histogram["count"]}'
+            )
+            lines.append(f'{name}_sum{{stage="{stage}"}} {histogram["sum"]}')
+            lines.append(
+                f'{name}_count{{stage="{stage}"}} {histogram["count"]}'
+            )
+        return '\n'.join(lines) + '\n'
+
+
+METRICS_FORMATS = {
+    JSON_METRICS_KEY: (
+        'json', lambda metrics: json.dumps(metrics.to_dict(), indent=2)
+    ),
+    PROMETHEUS_METRICS_KEY: ('prom', Metrics.to_prometheus),
+}
+
+registry = Metrics()
+
+
+def dump_metrics(cli_args):
+    extension, render = METRICS_FORMATS[cli_args.metrics]
+    metrics_dir = BASE_DIR / METRICS
+    metrics_dir.mkdir(exist_ok=True)
+    file_path = metrics_dir / METRICS_FILE_NAME.format(
+        parser_mode=cli_args.mode,
+        now=dt.datetime.now().strftime(DATETIME_FORMAT),
+        extension=extension,
+    )
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write(render(registry))
+    logging.info(METRICS_SAVE_MESSAGE.format(file_path=file_path))
@@ -1,29 +1,40 @@
-import csv
 import datetime as dt
 import logging
 
-from prettytable import PrettyTable
-
 from constants import (BASE_DIR, DATETIME_FORMAT, EXPORT_OUTPUT_KEY,
-                       FILE_NAME, NICE_CONSOLE_OUTPUT_KEY, RESULTS)
+                       FILE_NAME, NICE_CONSOLE_OUTPUT_KEY, PARQUET,
+                       PARQUET_FILE_NAME, PARQUET_OUTPUT_KEY, RESULTS,
+                       RESULTS_DB, SQLITE_OUTPUT_KEY, STORE)
+from lazy import lazy_from, lazy_import
+from metrics import registry
+from store import export_parquet, load_results, store_results
+
+csv = lazy_import('csv')
+PrettyTable = lazy_from('prettytable', 'PrettyTable')
 
 SAVE_MESSAGE = 'Файл с результатами был сохранён: {file_path}'
+STORE_MESSAGE = 'Строк записано в базу результатов {file_path}: {count}'
 
 
 def default_output(results, **kwargs):
     for row in results:
-        print(*row)
+        print(*row, flush=True)
 
 
 def pretty_output(results, **kwargs):
+    # column widths depend on every row, so the table is buffered
+    rows = list(results)
     table = PrettyTable()
-    table.field_names = results[0]
+    table.field_names = rows[0]
     table.align = 'l'
-    table.add_rows(results[1:])
+    table.add_rows(rows[1:])
     print(table)
 
 
 def file_output(results, cli_args):
+    # a mode failing before its header leaves no file behind
+    results = iter(results)
+    header = next(results)
     results_dir = BASE_DIR / RESULTS
     results_dir.mkdir(exist_ok=True)
     file_path = results_dir / FILE_NAME.format(
@@ -31,16 +42,40 @@ def file_output(results, cli_args):
         now=dt.datetime.now().strftime(DATETIME_FORMAT)
     )
     with open(file_path, 'w', encoding='utf-8') as f:
-        csv.writer(f, dialect=csv.unix_dialect).writerows(results)
+        writer = csv.writer(f, dialect=csv.unix_dialect)
+        writer.writerow(header)
+        for row in results:
+            writer.writerow(row)
+            f.flush()
+    logging.info(SAVE_MESSAGE.format(file_path=file_path))
+
+
+def sqlite_output(results, cli_args):
+    file_path = BASE_DIR / STORE / RESULTS_DB
+    run = dt.datetime.now().strftime(DATETIME_FORMAT)
+    count = store_results(results, file_path, cli_args.mode, run)
+    logging.info(STORE_MESSAGE.format(file_path=file_path, count=count))
+    return file_path, run
+
+
+def parquet_output(results, cli_args):
+    db_path, run = sqlite_output(results, cli_args)
+    file_path = BASE_DIR / STORE / PARQUET / cli_args.mode / (
+        PARQUET_FILE_NAME.format(now=run)
+    )
+    export_parquet(file_path, load_results(db_path, cli_args.mode, run))
     logging.info(SAVE_MESSAGE.format(file_path=file_path))
 
 
 OUTPUTS = {
     EXPORT_OUTPUT_KEY: file_output,
+    SQLITE_OUTPUT_KEY: sqlite_output,
+    PARQUET_OUTPUT_KEY: parquet_output,
     NICE_CONSOLE_OUTPUT_KEY: pretty_output,
     None: default_output
 }
 
 
 def control_output(results, cli_args):
-    OUTPUTS[cli_args.output](results, cli_args=cli_args)
+    with registry.timer('output'):
+        OUTPUTS[cli_args.output](results, cli_args=cli_args)
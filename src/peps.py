@@ -0,0 +1,173 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from urllib.parse import urljoin
+import json
+import logging
+
+from requests import HTTPError
+
+from exceptions import ParserFindTagException
+from extracts import extractor
+from lazy import lazy_from
+from metrics import registry
+from specs import PEP_CARD, PEP_INDEX
+from utils import extract_pages, get_response, parse_tree
+
+MISMATCH_MESSAGE = ('Несовпадающий статус:\n{}\n'
+                    'Статус в карточке: {}\n'
+                    'Статус в каталоге: {}')
+STATUS_NOT_FOUND = 'В карточке нет статуса: {}'
+JSON_INDEX_ERROR = 'JSON-каталог PEP не загрузился, разбор карточек: {}'
+# a broken or unreachable JSON index falls back to scraping the cards
+JSON_INDEX_ERRORS = (ConnectionError, HTTPError, ValueError, LookupError,
+                     TypeError)
+
+# aiohttp is imported only by the asyncio engine, tqdm by card loading
+get_response_async = lazy_from('async_utils', 'get_response_async')
+tqdm = lazy_from('tqdm', 'tqdm')
+
+
+class Pep(namedtuple(
+    'Pep', ('number', 'url', 'preview_status', 'actual_status')
+)):
+    """Запись о PEP: поля строки каталога и статус из карточки.
+
+    Не хранит ни soup, ни сессию, поэтому дёшево держится в памяти
+    тысячами, сериализуется pickle и передаётся в другие процессы.
+    """
+    __slots__ = ()
+
+    def __str__(self):
+        return (f'{self.number}:{self.preview_status}/'
+                f'{self.actual_status}[{self.url}]')
+
+
+def index_fields(row, base_url):
+    return {
+        'number': row['number'],
+        'url': urljoin(base_url, row['href']),
+        'preview_status': row['preview_status'],
+    }
+
+
+def parse_index(text, base_url):
+    return [
+        index_fields(row, base_url)
+        for row in PEP_INDEX.extract_all(parse_tree(text))
+    ]
+
+
+def parse_json_index(text, base_url):
+    """Записи PEP из JSON-каталога сайта, одним документом на все PEP.
+
+    Каталог собирается из тех же заголовков, что и карточки, поэтому
+    статус в нём один: это статус карточки, а статуса каталога нет
+    (None), и несовпадения по этому источнику не проверяются.
+    """
+    with registry.timer('extract_pep'):
+        return [
+            Pep(
+                number=str(record['number']),
+                url=urljoin(base_url, record['url']),
+                preview_status=None,
+                actual_status=record['status'],
+            )
+            for record in sorted(
+                json.loads(text).values(),
+                key=lambda record: record['number']
+            )
+        ]
+
+
+def fetch_json_index(session, url):
+    try:
+        response = get_response(session, url)
+        response.raise_for_status()
+        return parse_json_index(response.text, url)
+    except JSON_INDEX_ERRORS as e:
+        logging.warning(JSON_INDEX_ERROR.format(e))
+
+
+async def fetch_json_index_async(client, session, url):
+    try:
+        response = await get_response_async(client, session, url)
+        response.raise_for_status()
+        return parse_json_index(response.text, url)
+    except JSON_INDEX_ERRORS as e:
+        logging.warning(JSON_INDEX_ERROR.format(e))
+
+
+def card_status(tree, url):
+    try:
+        return PEP_CARD.extract(tree)['status']
+    except ParserFindTagException as e:
+        raise ParserFindTagException(STATUS_NOT_FOUND.format(url)) from e
+
+
+@extractor(version=2)
+def extract_pep(fields, text):
+    tree = parse_tree(text)
+    with registry.timer('extract_pep'):
+        pep = Pep(actual_status=card_status(tree, fields['url']), **fields)
+    if pep.preview_status != pep.actual_status:
+        logging.info(MISMATCH_MESSAGE.format(
+            pep.url,
+            pep.actual_status,
+            pep.preview_status
+        ))
+    return pep
+
+
+def fetch_card(url, session):
+    try:
+        return get_response(session, url).text
+    except ConnectionError as e:
+        logging.exception(e)
+
+
+def fetch_cards(session, urls, workers):
+    # map() keeps the index order regardless of which card loads first
+    with ThreadPoolExecutor(workers) as executor:
+        yield from executor.map(partial(fetch_card, session=session), urls)
+
+
+async def fetch_card_async(client, session, url):
+    try:
+        return (await get_response_async(client, session, url)).text
+    except ConnectionError as e:
+        logging.exception(e)
+
+
+def snapshot_pep(fields, snapshot):
+    known = snapshot.get(fields['url'])
+    if known is None or any(known[key] != fields[key] for key in fields):
+        return None
+    return Pep(**known)
+
+
+def known_peps(index, snapshot=None):
+    """Возвращает PEP из снимка и номера строк, карточки которых нужны."""
+    peps = [snapshot_pep(fields, snapshot or {}) for fields in index]
+    return peps, [number for number, pep in enumerate(peps) if pep is None]
+
+
+def fill_peps(index, peps, missing, texts, processes=1):
+    positions = {index[number]['url']: number for number in missing}
+    pages = (
+        (index[number], text)
+        for number, text in zip(missing, texts) if text is not None
+    )
+    for pep in extract_pages(extract_pep, pages, processes):
+        peps[positions[pep.url]] = pep
+    return [pep for pep in peps if pep is not None]
+
+
+def load_peps(session, index, workers, snapshot=None, processes=1):
+    peps, missing = known_peps(index, snapshot)
+    texts = fetch_cards(
+        session, [index[number]['url'] for number in missing], workers
+    )
+    return fill_peps(
+        index, peps, missing, tqdm(texts, total=len(missing)), processes
+    )
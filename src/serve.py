@@ -0,0 +1,143 @@
+from collections import namedtuple
+from hashlib import blake2b
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+import datetime as dt
+import json
+import logging
+
+from constants import DATETIME_FORMAT, SERVE_RETRY_AFTER
+from store import plain
+
+SERVE_START = 'Результаты режимов доступны по адресу http://{}:{}/'
+SERVE_STOP = 'Сервер результатов остановлен'
+NO_TABLE = 'Режим {} не возвращает таблицу и не будет отдаваться'
+UNKNOWN_MODE = 'Режим {} не обслуживается'
+NOT_READY = 'Результаты режима {} ещё не получены'
+REQUEST_LOG = 'Запрос к серверу результатов: {}'
+JSON_TYPE = 'application/json; charset=utf-8'
+
+Table = namedtuple('Table', 'etag body')
+
+
+def json_body(data):
+    return json.dumps(
+        data, ensure_ascii=False, default=plain
+    ).encode('utf-8')
+
+
+def etag(body):
+    return f'"{blake2b(body, digest_size=16).hexdigest()}"'
+
+
+class ResultTables:
+    """Готовые JSON-ответы по режимам, которые обновляет фоновый опрос.
+
+    Запрос читателя не запускает разбор: он получает последний
+    опубликованный ответ или 503, пока первый опрос не завершён.
+    """
+
+    def __init__(self, modes):
+        self.modes = list(modes)
+        self.tables = {}
+        self.lock = Lock()
+        self.index = self.make_index()
+
+    def make_index(self):
+        body = json_body({'modes': {
+            mode: f'/{mode}' for mode in self.modes if mode in self.tables
+        }})
+        return Table(etag(body), body)
+
+    def publish(self, mode, results):
+        if results is None:
+            logging.warning(NO_TABLE.format(mode))
+            with self.lock:
+                if mode in self.modes:
+                    self.modes.remove(mode)
+                self.index = self.make_index()
+            return
+        header, *rows = results
+        data = {'mode': mode, 'header': header, 'rows': rows}
+        # the tag covers the rows only, so it survives unchanged refreshes
+        tag = etag(json_body(data))
+        with self.lock:
+            if mode in self.tables and self.tables[mode].etag == tag:
+                return
+        # the body is encoded once per change, readers only copy bytes
+        data['updated'] = dt.datetime.now().strftime(DATETIME_FORMAT)
+        table = Table(tag, json_body(data))
+        with self.lock:
+            self.tables[mode] = table
+            self.index = self.make_index()
+
+    def get(self, mode):
+        """Ответ режима, `None` до первого опроса, KeyError для чужого."""
+        with self.lock:
+            if not mode:
+                return self.index
+            if mode not in self.modes:
+                raise KeyError(mode)
+            return self.tables.get(mode)
+
+
+class ResultHandler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        mode = self.path.split('?')[0].strip('/')
+        try:
+            table = self.server.tables.get(mode)
+        except KeyError:
+            return self.send_error_json(
+                HTTPStatus.NOT_FOUND, UNKNOWN_MODE.format(mode)
+            )
+        if table is None:
+            return self.send_error_json(
+                HTTPStatus.SERVICE_UNAVAILABLE, NOT_READY.format(mode),
+                {'Retry-After': SERVE_RETRY_AFTER}
+            )
+        if table.etag in self.headers.get('If-None-Match', ''):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header('ETag', table.etag)
+            self.end_headers()
+            return
+        self.send_body(HTTPStatus.OK, table.body, {'ETag': table.etag})
+
+    def send_error_json(self, status, message, headers=None):
+        self.send_body(status, json_body({'error': message}), headers)
+
+    def send_body(self, status, body, headers=None):
+        self.send_response(status)
+        self.send_header('Content-Type', JSON_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        # clients revalidate every time, an unchanged table costs a 304
+        self.send_header('Cache-Control', 'no-cache')
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logging.debug(REQUEST_LOG.format(format % args))
+
+
+class ResultServer(ThreadingHTTPServer):
+    """HTTP-сервер результатов, работающий в фоновом потоке."""
+
+    daemon_threads = True
+
+    def __init__(self, address, tables):
+        super().__init__(address, ResultHandler)
+        self.tables = tables
+        self.thread = Thread(target=self.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        logging.info(SERVE_START.format(*self.server_address[:2]))
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
+        logging.info(SERVE_STOP)
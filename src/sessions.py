@@ -0,0 +1,76 @@
+from collections import namedtuple
+from io import BytesIO
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError
+from requests_cache import CachedSession
+from urllib3 import HTTPResponse
+
+from archive import http_archive
+from constants import CONNECT_TIMEOUT, POOL_HOSTS, READ_TIMEOUT, WORKERS
+from throttle import throttled
+
+Timeouts = namedtuple('Timeouts', 'connect read')
+DEFAULT_TIMEOUTS = Timeouts(CONNECT_TIMEOUT, READ_TIMEOUT)
+
+
+class TimeoutAdapter(HTTPAdapter):
+    """Транспорт с пулом соединений и сроками ожидания по умолчанию."""
+
+    def __init__(self, timeouts=DEFAULT_TIMEOUTS, pool_size=WORKERS):
+        # every host keeps up to pool_size sockets alive between requests
+        super().__init__(pool_connections=POOL_HOSTS, pool_maxsize=pool_size)
+        self.timeouts = timeouts
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(
+            request, timeout=timeout or tuple(self.timeouts), **kwargs
+        )
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Транспорт, отвечающий из http_archive, без сети."""
+
+    def send(self, request, **kwargs):
+        try:
+            exchange = http_archive.replay(request.method, request.url)
+        except LookupError as e:
+            raise ConnectionError(e, request=request)
+        return self.build_response(request, HTTPResponse(
+            body=BytesIO(exchange.body),
+            headers=exchange.headers,
+            status=exchange.status,
+            reason=exchange.reason,
+            # a HEAD response keeps Content-Length but has no body
+            request_method=request.method,
+            preload_content=False,
+            decode_content=False,
+        ))
+
+
+def make_session(
+    pool_size=WORKERS, timeouts=DEFAULT_TIMEOUTS, replay=False,
+    **cache_settings
+):
+    """Кеширующая сессия, через которую работают все режимы.
+
+    Пул соединений рассчитан на pool_size одновременных загрузок,
+    запросы мимо кеша проходят через ограничитель и повторы throttle.
+    С replay ответы берутся из архива без ограничений скорости.
+    """
+    timeouts = Timeouts(*timeouts)
+    session = CachedSession(**cache_settings)
+    session.timeouts = timeouts
+    if replay:
+        adapter = ReplayAdapter()
+        for prefix in ('https://', 'http://'):
+            session.mount(prefix, adapter)
+        return session
+    adapter = TimeoutAdapter(timeouts, pool_size)
+    for prefix in ('https://', 'http://'):
+        session.mount(prefix, adapter)
+    return throttled(session)
+
+
+def session_timeouts(session):
+    return getattr(session, 'timeouts', DEFAULT_TIMEOUTS)
@@ -0,0 +1,26 @@
+import json
+import logging
+
+SNAPSHOT_LOAD_ERROR = 'Снимок {} не прочитан, он будет пересоздан: {}'
+SNAPSHOT_SAVE_MESSAGE = 'Снимок результатов был сохранён: {}'
+
+
+def load_snapshot(path):
+    try:
+        with open(path, encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return {}
+    except ValueError as e:
+        logging.warning(SNAPSHOT_LOAD_ERROR.format(path, e))
+        return {}
+
+
+def save_snapshot(path, snapshot):
+    path.parent.mkdir(exist_ok=True)
+    temp_path = path.with_suffix('.tmp')
+    with open(temp_path, 'w', encoding='utf-8') as file:
+        json.dump(snapshot, file, ensure_ascii=False, indent=1)
+    # a run killed halfway must not leave a truncated snapshot behind
+    temp_path.replace(path)
+    logging.info(SNAPSHOT_SAVE_MESSAGE.format(path))
@@ -0,0 +1,205 @@
+from functools import cached_property
+import re
+
+from exceptions import ParserFindTagException
+from lazy import lazy_import
+
+# compiled on the first extraction, main.py imports the specs for free
+etree = lazy_import('lxml.etree')
+soupsieve = lazy_import('soupsieve')
+
+NOT_FOUND_MESSAGE = 'Описание {}: не найдено {}'
+
+
+def has_class(name):
+    """Условие XPath 1.0, равносильное `.name` в CSS."""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def is_tree(node):
+    # a bs4 Tag answers any unknown attribute, so check the type
+    return isinstance(node, etree._Element)
+
+
+class Selector:
+    """Один выбор элементов на CSS для bs4 и на XPath для lxml.
+
+    Каждое выражение компилируется один раз, при первом применении
+    к дереву своего типа, и дальше только исполняется.
+    """
+
+    def __init__(self, css, xpath):
+        self.css = css
+        self.xpath = xpath
+
+    @cached_property
+    def compiled_css(self):
+        return soupsieve.compile(self.css)
+
+    @cached_property
+    def compiled_xpath(self):
+        return etree.XPath(self.xpath)
+
+    def select(self, node):
+        if is_tree(node):
+            return self.compiled_xpath(node)
+        return self.compiled_css.select(node)
+
+    def select_one(self, node):
+        if is_tree(node):
+            found = self.compiled_xpath(node)
+            return found[0] if found else None
+        return self.compiled_css.select_one(node)
+
+    def __str__(self):
+        return self.css
+
+
+class Field:
+    """Поле записи: текст или атрибут элемента внутри записи.
+
+    Без селектора берётся сама запись. Именованные группы pattern
+    становятся полями записи; без совпадения текст целиком идёт
+    в поле name, остальные группы пустые.
+    """
+
+    def __init__(self, name, css=None, xpath=None, attr=None, pattern=None):
+        self.name = name
+        self.selector = None if css is None else Selector(css, xpath)
+        self.attr = attr
+        self.pattern = None if pattern is None else re.compile(pattern)
+
+    def value(self, node):
+        if self.attr is not None:
+            return node.get(self.attr)
+        if is_tree(node):
+            # a plain str, lxml smart strings keep the whole tree alive
+            return str(node.text_content())
+        return node.get_text()
+
+    def extract(self, record, spec):
+        node = record
+        if self.selector is not None:
+            node = self.selector.select_one(record)
+            if node is None:
+                raise ParserFindTagException(
+                    NOT_FOUND_MESSAGE.format(spec, self.selector)
+                )
+        value = self.value(node)
+        if self.pattern is None:
+            return {self.name: value}
+        match = self.pattern.search(value)
+        if match:
+            return match.groupdict('')
+        groups = dict.fromkeys(self.pattern.groupindex, '')
+        return {**groups, self.name: value}
+
+
+class Spec:
+    """Описание полей, которые режим извлекает со страницы.
+
+    scope сужает поиск до первого подходящего элемента, records
+    выбирает в нём записи (без него запись одна - сам scope),
+    fields извлекаются из каждой записи. Одно описание работает
+    и на дереве BeautifulSoup, и на дереве lxml.
+    """
+
+    def __init__(self, name, fields, scope=None, records=None):
+        self.name = name
+        self.fields = fields
+        self.scope = None if scope is None else Selector(*scope)
+        self.records = None if records is None else Selector(*records)
+
+    def record(self, node):
+        values = {}
+        for field in self.fields:
+            values.update(field.extract(node, self))
+        return values
+
+    def find_scope(self, tree):
+        if self.scope is None:
+            return tree
+        scope = self.scope.select_one(tree)
+        if scope is None:
+            raise ParserFindTagException(
+                NOT_FOUND_MESSAGE.format(self, self.scope)
+            )
+        return scope
+
+    def extract(self, tree):
+        """Словарь полей одной записи."""
+        return self.record(self.find_scope(tree))
+
+    def extract_all(self, tree):
+        """Список словарей полей всех записей."""
+        return [
+            self.record(node)
+            for node in self.records.select(self.find_scope(tree))
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+PEP_INDEX = Spec(
+    'каталога PEP',
+    scope=(
+        '#numerical-index tbody',
+        "//*[@id='numerical-index']//tbody",
+    ),
+    records=('tr', './/tr'),
+    fields=[
+        Field('number', 'a', './/a'),
+        Field('href', 'a', './/a', attr='href'),
+        # "Standards Track, Final" -> "Final"
+        Field(
+            'preview_status', 'abbr', './/abbr', attr='title',
+            pattern=r'(?P<preview_status>[^,\s][^,]*)$'
+        ),
+    ],
+)
+PEP_CARD = Spec('карточки PEP', fields=[
+    Field(
+        'status',
+        'dt:-soup-contains-own("Status") + dd',
+        "//dt[normalize-space()='Status:']/following-sibling::dd[1]",
+    ),
+])
+WHATS_NEW_INDEX = Spec(
+    'списка версий',
+    records=(
+        '#what-s-new-in-python div.toctree-wrapper li.toctree-l1 > a',
+        "//*[@id='what-s-new-in-python']"
+        f"//div[{has_class('toctree-wrapper')}]"
+        f"//li[{has_class('toctree-l1')}]/a",
+    ),
+    fields=[Field('href', attr='href')],
+)
+WHATS_NEW_VERSION = Spec('страницы версии', fields=[
+    Field('title', 'h1', '//h1'),
+    Field('editors', 'dl', '//dl'),
+])
+LATEST_VERSIONS = Spec(
+    'версий документации',
+    scope=(
+        'div.sphinxsidebarwrapper ul:-soup-contains("All versions")',
+        f"//div[{has_class('sphinxsidebarwrapper')}]"
+        f"//ul[contains(., 'All versions')]",
+    ),
+    records=('a', './/a'),
+    fields=[
+        Field('href', attr='href'),
+        Field(
+            'version',
+            pattern=r'Python (?P<version>\d\.\d+) \((?P<status>.*)\)'
+        ),
+    ],
+)
+DOWNLOAD_ARCHIVE = Spec('страницы загрузки', fields=[
+    Field(
+        'href',
+        'a[href$="pdf-a4.zip"]',
+        "//a[substring(@href, string-length(@href) - 9) = 'pdf-a4.zip']",
+        attr='href'
+    ),
+])
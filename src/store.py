@@ -0,0 +1,117 @@
+from contextlib import closing
+from itertools import islice
+import json
+import sqlite3
+
+from constants import ROW_KEY_COLUMNS, STORE_BATCH_SIZE
+
+CREATE_TABLES = '''
+CREATE TABLE IF NOT EXISTS runs (
+    mode TEXT NOT NULL,
+    run TEXT NOT NULL,
+    header TEXT NOT NULL,
+    PRIMARY KEY (mode, run)
+);
+CREATE TABLE IF NOT EXISTS results (
+    mode TEXT NOT NULL,
+    run TEXT NOT NULL,
+    key TEXT NOT NULL,
+    row TEXT NOT NULL,
+    PRIMARY KEY (mode, run, key)
+);
+CREATE INDEX IF NOT EXISTS results_history ON results (mode, key, run);
+'''
+UPSERT_RUN = '''INSERT INTO runs VALUES (?, ?, ?)
+ON CONFLICT (mode, run) DO UPDATE SET header = excluded.header'''
+UPSERT_RESULT = '''INSERT INTO results VALUES (?, ?, ?, ?)
+ON CONFLICT (mode, run, key) DO UPDATE SET row = excluded.row'''
+PARQUET_MISSING_MESSAGE = (
+    'Для вывода в Parquet установите пакет pyarrow: {}'
+)
+
+
+def plain(value):
+    # editors of whats-new rows are kept as utf-8 bytes
+    if isinstance(value, bytes):
+        return value.decode('utf-8')
+    return value
+
+
+def connect(path):
+    path.parent.mkdir(exist_ok=True)
+    connection = sqlite3.connect(path)
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.executescript(CREATE_TABLES)
+    return connection
+
+
+def row_key(row, columns):
+    return '|'.join(str(plain(row[column])) for column in columns)
+
+
+def store_results(results, path, mode, run):
+    """Записывает строки режима в базу и возвращает их число.
+
+    Ключ строки - её первый столбец (номер или статус PEP, ссылка
+    на версию) или столбцы режима из ROW_KEY_COLUMNS. Строки пишутся
+    пачками по STORE_BATCH_SIZE в отдельных транзакциях, повторная
+    запись того же ключа заменяет строку и второй раз не считается.
+    """
+    results = iter(results)
+    header = [plain(value) for value in next(results)]
+    columns = ROW_KEY_COLUMNS.get(mode, (0,))
+    keys = set()
+    with closing(connect(path)) as connection:
+        with connection:
+            connection.execute(
+                UPSERT_RUN,
+                (mode, run, json.dumps(header, ensure_ascii=False))
+            )
+        while True:
+            batch = [
+                (
+                    mode,
+                    run,
+                    row_key(row, columns),
+                    json.dumps([plain(value) for value in row],
+                               ensure_ascii=False)
+                )
+                for row in islice(results, STORE_BATCH_SIZE)
+            ]
+            if not batch:
+                return len(keys)
+            with connection:
+                connection.executemany(UPSERT_RESULT, batch)
+            keys.update(key for _, _, key, _ in batch)
+
+
+def load_results(path, mode, run):
+    with closing(connect(path)) as connection:
+        header = connection.execute(
+            'SELECT header FROM runs WHERE mode = ? AND run = ?', (mode, run)
+        ).fetchone()
+        if header is None:
+            return []
+        rows = connection.execute(
+            'SELECT row FROM results WHERE mode = ? AND run = ? '
+            'ORDER BY rowid', (mode, run)
+        ).fetchall()
+    return [tuple(json.loads(header[0]))] + [
+        tuple(json.loads(row)) for row, in rows
+    ]
+
+
+def export_parquet(path, rows):
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise RuntimeError(PARQUET_MISSING_MESSAGE.format(e))
+    header, *rows = rows
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pyarrow.parquet.write_table(
+        pyarrow.Table.from_pylist(
+            [dict(zip(header, map(str, row))) for row in rows]
+        ),
+        path
+    )
@@ -0,0 +1,240 @@
+from collections import deque
+from email.utils import parsedate_to_datetime
+from threading import Condition, Lock
+from urllib.parse import urlsplit
+import datetime as dt
+import random
+import time
+
+from requests import RequestException
+from requests.adapters import BaseAdapter, HTTPAdapter
+
+from constants import (BACKOFF, MAX_RETRY_DELAY, RATE_LIMIT, RETRIES,
+                       RETRY_STATUSES, WORKERS)
+from lazy import lazy_import
+from metrics import registry
+
+# only the asyncio engine waits with asyncio
+asyncio = lazy_import('asyncio')
+
+
+def retry_after(response):
+    if response is None:
+        return None
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max((date - dt.datetime.now(dt.timezone.utc)).total_seconds(), 0.0)
+
+
+def failed(response, error):
+    if error is not None or response is None:
+        return True
+    return response.status_code in RETRY_STATUSES
+
+
+class HostLimit:
+    """Темп и число одновременных запросов к одному хосту.
+
+    Темп задаёт ведро токенов. Предел одновременных запросов растёт на
+    единицу за каждые limit успешных ответов и делится пополам при
+    ошибке или ответе о перегрузке сервера. Потоки ждут места на
+    условии, корутины - на futures, которые будит освободивший место.
+    """
+
+    def __init__(self, rate, concurrency):
+        self.available = Condition()
+        self.waiters = deque()
+        self.rate = rate
+        self.burst = concurrency
+        self.tokens = float(concurrency)
+        self.updated = time.monotonic()
+        self.max_limit = concurrency
+        self.limit = float(concurrency)
+        self.active = 0
+
+    def reserve(self):
+        """Забирает токен и возвращает, сколько секунд ждать до запроса."""
+        if self.rate is None:
+            return 0.0
+        with self.available:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            self.tokens -= 1
+            return max(-self.tokens / self.rate, 0.0)
+
+    def try_enter(self):
+        with self.available:
+            if self.active >= int(self.limit):
+                return False
+            self.active += 1
+            return True
+
+    def enter(self):
+        with self.available:
+            self.available.wait_for(lambda: self.active < int(self.limit))
+            self.active += 1
+
+    async def enter_async(self):
+        with self.available:
+            if not self.waiters and self.active < int(self.limit):
+                self.active += 1
+                return
+            future = asyncio.get_running_loop().create_future()
+            self.waiters.append(future)
+        # the slot is taken for the waiter before its future is resolved
+        await future
+
+    def wake(self):
+        # called with the condition held, hands free slots out in order
+        while self.waiters and self.active < int(self.limit):
+            future = self.waiters.popleft()
+            self.active += 1
+            future.get_loop().call_soon_threadsafe(self.grant, future)
+
+    def grant(self, future):
+        if not future.cancelled():
+            future.set_result(None)
+            return
+        # the waiter is gone, its slot goes to the next one
+        with self.available:
+            self.active -= 1
+            self.wake()
+            self.available.notify_all()
+
+    def leave(self, ok):
+        with self.available:
+            self.active -= 1
+            if ok:
+                self.limit = min(self.limit + 1 / self.limit, self.max_limit)
+            else:
+                self.limit = max(self.limit / 2, 1.0)
+                registry.inc('throttle_backoffs')
+            self.wake()
+            self.available.notify_all()
+
+
+class Throttle:
+    """Ограничители запросов по хостам и повторы с паузами.
+
+    Повторяются сетевые ошибки и ответы со статусами RETRY_STATUSES.
+    Пауза берётся из Retry-After, иначе растёт вдвое с каждой попыткой
+    и выбирается случайно, чтобы потоки не повторяли запросы разом.
+    """
+
+    def __init__(self):
+        self.configure()
+
+    def configure(
+        self,
+        rate=RATE_LIMIT,
+        concurrency=WORKERS,
+        retries=RETRIES,
+        backoff=BACKOFF
+    ):
+        self.lock = Lock()
+        self.hosts = {}
+        self.rate = rate
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+
+    def host(self, url):
+        netloc = urlsplit(url).netloc
+        with self.lock:
+            if netloc not in self.hosts:
+                self.hosts[netloc] = HostLimit(self.rate, self.concurrency)
+            return self.hosts[netloc]
+
+    def retry_delay(self, attempt, response=None):
+        delay = retry_after(response)
+        if delay is None:
+            delay = random.uniform(0, self.backoff * 2 ** attempt)
+        return min(delay, MAX_RETRY_DELAY)
+
+    def give_up(self, attempt, response, error):
+        """Решает, вернуть ли результат попытки, и считает повторы."""
+        if not failed(response, error):
+            return True
+        if attempt == self.retries:
+            registry.inc('fetch_dropped')
+            return True
+        registry.inc('fetch_retries')
+        return False
+
+    def send(self, url, send):
+        limit = self.host(url)
+        for attempt in range(self.retries + 1):
+            response = error = None
+            limit.enter()
+            try:
+                time.sleep(limit.reserve())
+                response = send()
+            except RequestException as e:
+                error = e
+            finally:
+                limit.leave(not failed(response, error))
+            if self.give_up(attempt, response, error):
+                break
+            if response is not None:
+                response.close()
+            time.sleep(self.retry_delay(attempt, response))
+        if error is not None:
+            raise error
+        return response
+
+    async def send_async(self, url, send, errors):
+        limit = self.host(url)
+        for attempt in range(self.retries + 1):
+            response = error = None
+            await limit.enter_async()
+            try:
+                await asyncio.sleep(limit.reserve())
+                response = await send()
+            except errors as e:
+                error = e
+            finally:
+                limit.leave(not failed(response, error))
+            if self.give_up(attempt, response, error):
+                break
+            await asyncio.sleep(self.retry_delay(attempt, response))
+        if error is not None:
+            raise error
+        return response
+
+
+throttle = Throttle()
+
+
+class ThrottledAdapter(BaseAdapter):
+    """Транспорт, пропускающий через throttle запросы мимо кеша."""
+
+    def __init__(self, adapter=None):
+        super().__init__()
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        return throttle.send(
+            request.url, lambda: self.adapter.send(request, **kwargs)
+        )
+
+    def close(self):
+        self.adapter.close()
+
+
+def throttled(session):
+    # the cache answers before the transport, so hits are never throttled
+    for prefix in ('https://', 'http://'):
+        session.mount(prefix, ThrottledAdapter(session.get_adapter(prefix)))
+    return session
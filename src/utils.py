@@ -1,20 +1,60 @@
-from requests import RequestException
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import multiprocessing
+
+from requests import Request, RequestException
 
 from bs4 import BeautifulSoup
+from lxml.html import document_fromstring
 
+from archive import http_archive
 from exceptions import ParserFindTagException
+from extracts import extract_cache
+from http_cache import access_log, revalidation
+from metrics import registry
 
 LOAD_ERROR_MESSAGE = 'Возникла ошибка при загрузке страницы {} [{}]'
 SEARCH_ERROR_MESSAGE = 'Не найден тег {tag} {attrs} {kwargs}'
+EMPTY_PAGE = '<html></html>'
+
 
+def archive_response(url, response, method='GET', body=None, path=None):
+    """Записывает ответ в http_archive телом body, файлом path или своим."""
+    if not http_archive.recording:
+        return
+    # replay looks the response up by the URL of the prepared request
+    exchange = (
+        method,
+        Request(method, url).prepare().url,
+        response.status_code,
+        response.reason,
+        response.headers,
+    )
+    if path is not None:
+        http_archive.record_file(*exchange, path)
+        return
+    http_archive.record(
+        *exchange, response.content if body is None else body
+    )
 
-def get_response(session, url, encoding='utf-8'):
+
+def get_response(session, url, encoding='utf-8', expire_after=None):
+    # None keeps the expiration configured for the session and the URL
+    options = {} if expire_after is None else {'expire_after': expire_after}
+    # pinned pages keep their expiration, the rest are revalidated per poll
+    if expire_after is None and revalidation.needed(url):
+        options['refresh'] = True
     try:
-        response = session.get(url)
-        response.encoding = encoding
-        return response
+        with registry.timer('fetch'):
+            response = session.get(url, **options)
     except RequestException as e:
+        registry.inc('fetch_errors')
         raise ConnectionError(LOAD_ERROR_MESSAGE.format(url, e))
+    registry.record_response(response)
+    access_log.touch(getattr(response, 'cache_key', None))
+    archive_response(url, response)
+    response.encoding = encoding
+    return response
 
 
 def find_tag(soup, tag=None, attrs=None, **kwargs):
@@ -28,5 +68,50 @@ def find_tag(soup, tag=None, attrs=None, **kwargs):
     return searched_tag
 
 
+def parse_soup(text, features='lxml'):
+    with registry.timer('parse'):
+        return BeautifulSoup(text, features=features)
+
+
+def parse_tree(text):
+    # lxml builds the tree in C, several times faster than BeautifulSoup;
+    # unlike it lxml rejects an empty page, so that one gets an empty tree
+    with registry.timer('parse'):
+        if not text or text.isspace():
+            return document_fromstring(EMPTY_PAGE)
+        return document_fromstring(text)
+
+
 def make_soup(session, url, features='lxml'):
-    return BeautifulSoup(get_response(session, url).text, features=features)
+    return parse_soup(get_response(session, url).text, features)
+
+
+def make_tree(session, url):
+    return parse_tree(get_response(session, url).text)
+
+
+def extract_page(extract, page):
+    return extract(*page)
+
+
+def parse_pages(extract, pages, processes=1):
+    """Применяет extract к парам (ключ, текст страницы).
+
+    При processes > 1 страницы разбираются в пуле процессов, обратно
+    передаются только извлечённые записи, а не деревья soup.
+    """
+    if processes <= 1:
+        yield from (extract(*page) for page in pages)
+        return
+    # spawn: forking while the fetching threads hold locks may deadlock
+    with ProcessPoolExecutor(
+        processes, mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        yield from executor.map(partial(extract_page, extract), pages)
+
+
+def extract_pages(extract, pages, processes=1):
+    parse = partial(parse_pages, extract, processes=processes)
+    if not extract_cache.caches(extract):
+        return parse(pages)
+    return extract_cache.extract_pages(extract, pages, parse)
@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+import heapq
+import logging
+import signal
+import time
+
+from constants import WATCH_TICK
+
+WATCH_START = 'Наблюдение за режимами: {}'
+WATCH_STOP = 'Наблюдение остановлено сигналом {}'
+POLL_ERROR = 'Опрос режима {} завершился с ошибкой: {}'
+NO_CHANGES = 'Режим {}: изменений нет'
+STOP_SIGNALS = (signal.SIGTERM, signal.SIGINT)
+
+
+def changed_rows(previous, results):
+    """Строки, которых не было в прошлом опросе, и строки этого опроса.
+
+    Заголовок выводится вместе с изменениями, без изменений - ничего.
+    """
+    header, *rows = (tuple(row) for row in results)
+    changed = [row for row in rows if row not in previous]
+    return ([header, *changed] if changed else None), set(rows)
+
+
+class Watcher:
+    """Опрашивает режимы каждый со своим интервалом до сигнала остановки.
+
+    Сигнал лишь поднимает флаг: начатый опрос доводится до конца,
+    а ожидание следующего прерывается не позже чем через WATCH_TICK.
+    """
+
+    def __init__(self, schedule, poll, emit):
+        self.schedule = schedule
+        self.poll = poll
+        self.emit = emit
+        self.stopped = None
+
+    def stop(self, signum, frame=None):
+        self.stopped = signal.Signals(signum).name
+
+    @contextmanager
+    def signals(self):
+        previous = {
+            signum: signal.signal(signum, self.stop)
+            for signum in STOP_SIGNALS
+        }
+        try:
+            yield
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+    def sleep_until(self, due):
+        while self.stopped is None:
+            remaining = due - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(min(remaining, WATCH_TICK))
+
+    def poll_once(self, mode_args, previous):
+        try:
+            results = self.poll(mode_args)
+            if results is None:
+                return previous
+            changed, previous = changed_rows(previous, results)
+            if changed is None:
+                logging.info(NO_CHANGES.format(mode_args.mode))
+            else:
+                self.emit(changed, mode_args)
+        except Exception as e:
+            logging.exception(POLL_ERROR.format(mode_args.mode, e))
+        return previous
+
+    def run(self):
+        logging.info(WATCH_START.format(', '.join(
+            f'{mode_args.mode}={interval}'
+            for mode_args, interval in self.schedule
+        )))
+        self.stopped = None
+        queue = [
+            (time.monotonic(), number) for number in range(len(self.schedule))
+        ]
+        seen = [set() for _ in self.schedule]
+        with self.signals():
+            while self.stopped is None:
+                due, number = heapq.heappop(queue)
+                self.sleep_until(due)
+                if self.stopped is not None:
+                    break
+                mode_args, interval = self.schedule[number]
+                seen[number] = self.poll_once(mode_args, seen[number])
+                # a poll longer than the interval delays, not piles up
+                heapq.heappush(
+                    queue, (max(due + interval, time.monotonic()), number)
+                )
+        logging.info(WATCH_STOP.format(self.stopped))
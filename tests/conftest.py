@@ -1,10 +1,13 @@
+import hashlib
 import pytest
 import sys
 from pathlib import Path
 from bs4 import BeautifulSoup
 import requests_mock
 from argparse import Namespace
-from typing import List, Tuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Dict, List, Tuple
 
 from requests_cache import CachedSession, ALL_METHODS
 from requests_mock import Adapter
@@ -16,6 +19,16 @@ sys.path.append(str(SRC_DIR))
 
 MAIN_DOC_URL = 'https://docs.python.org/3/'
 PEP_URL = 'https://www.python.org/dev/peps/'
+PEP_INDEX_URL = 'https://peps.python.org/'
+FIXTURE_PAGES_DIR = BASE_DIR / 'tests' / 'fixture_data' / 'pages'
+PEP_JSON_PATH = 'api/peps.json'
+PEP_CARD_STATUSES = {
+    '0001': 'Active',
+    '0002': 'Withdrawn',
+    '0008': 'Final',
+    '0020': 'Active',
+    '0736': 'Draft',
+}
 
 
 precode_files = ['constants.py', 'main.py', 'utils.py']
@@ -34,7 +47,8 @@ def pytest_make_parametrize_id(config, val):
 @pytest.fixture(scope='function')
 def tempfile_session() -> CachedSession:
     """Get a CachedSession using a temporary SQLite db"""
-    yield CachedSession(
+    from src.sessions import make_session
+    yield make_session(
         backend='memory',
         allowable_methods=ALL_METHODS,
     )
@@ -67,11 +81,115 @@ def mount_mock_adapter(session: CachedSession) -> CachedSession:
     return session
 
 
+WHATS_NEW_EDITORS = {
+    '3.12': 'Adam Turner',
+    '3.11': 'Pablo Galindo Salgado',
+    '2.0': 'A.M. Kuchling and Moshe Zadka',
+}
+
+
+def get_pep_pages() -> Dict[str, str]:
+    pages = {'': (FIXTURE_PAGES_DIR / 'pep_index.html').read_text('utf-8')}
+    card = (FIXTURE_PAGES_DIR / 'pep_card.html').read_text('utf-8')
+    for number, status in PEP_CARD_STATUSES.items():
+        pages[f'pep-{number}/'] = card.format(
+            number=int(number), title='Title', status=status
+        )
+    return pages
+
+
+def get_pep_json_pages() -> Dict[str, str]:
+    return {
+        PEP_JSON_PATH: (FIXTURE_PAGES_DIR / 'peps.json').read_text('utf-8')
+    }
+
+
+def get_whats_new_pages() -> Dict[str, str]:
+    pages = {
+        '': (FIXTURE_PAGES_DIR / 'whatsnew_index.html').read_text('utf-8')
+    }
+    version_page = (
+        FIXTURE_PAGES_DIR / 'whatsnew_version.html'
+    ).read_text('utf-8')
+    for version, editor in WHATS_NEW_EDITORS.items():
+        pages[f'{version}.html'] = version_page.format(
+            version=version, slug=version.replace('.', '-'), editor=editor
+        )
+    return pages
+
+
+def get_pages_adapter(pages: Dict[str, str], base_url: str) -> Adapter:
+    adapter = Adapter()
+    for path, text in pages.items():
+        adapter.register_uri(
+            'GET', base_url + path, text=text, status_code=200
+        )
+    return adapter
+
+
+def get_pep_adapter() -> Adapter:
+    return get_pages_adapter(get_pep_pages(), PEP_INDEX_URL)
+
+
 @pytest.fixture(scope='function')
 def mock_session(tempfile_session) -> CachedSession:
     yield mount_mock_adapter(tempfile_session)
 
 
+@pytest.fixture(scope='function')
+def pep_session(tempfile_session) -> CachedSession:
+    tempfile_session.mount(PEP_INDEX_URL, get_pep_adapter())
+    yield tempfile_session
+
+
+class FixturePagesHandler(BaseHTTPRequestHandler):
+    pages: Dict[str, str] = {}
+    requested: List[str] = []
+
+    def do_GET(self):
+        path = self.path.lstrip('/')
+        self.requested.append(path)
+        if path not in self.pages:
+            self.send_error(404)
+            return
+        body = self.pages[path].encode('utf-8')
+        etag = '"{}"'.format(hashlib.md5(body).hexdigest())
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Serve fixture pages from a stand-in HTTP server on localhost."""
+    def _local_server(pages: Dict[str, str]) -> Tuple[str, List[str]]:
+        handler = type(
+            'Handler',
+            (FixturePagesHandler,),
+            {'pages': pages, 'requested': []},
+        )
+        server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_port}/', handler.requested
+    servers = []
+    yield _local_server
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
 @pytest.fixture
 def response_page(mock_session):
     def _response_page(page):
@@ -0,0 +1,75 @@
+import pytest
+try:
+    from src import archive
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `archive.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `archive.py`'
+
+PAGE = '<html>{}</html>'.format('<p>PEP 8</p>' * 500).encode()
+
+
+@pytest.fixture
+def http_archive():
+    http_archive = archive.HttpArchive()
+    yield http_archive
+    http_archive.close()
+
+
+def test_record_and_replay(tmp_path, http_archive):
+    path = tmp_path / 'run.sqlite'
+    http_archive.open(path)
+    assert http_archive.recording
+    http_archive.record('GET', 'https://peps.python.org/', 200, 'OK', {
+        'Content-Type': 'text/html',
+        'Content-Encoding': 'gzip',
+        'Transfer-Encoding': 'chunked',
+    }, PAGE)
+    stored, = http_archive.connection.execute(
+        'SELECT length(body) FROM exchanges'
+    ).fetchone()
+    assert stored < len(PAGE) / 10, 'Тела ответов должны храниться сжатыми'
+    http_archive.close()
+    http_archive.open(path, replay=True)
+    assert not http_archive.recording
+    http_archive.record('GET', 'https://peps.python.org/', 500, '', {}, b'')
+    exchange = http_archive.replay('GET', 'https://peps.python.org/')
+    assert exchange == archive.Exchange(200, 'OK', {
+        'Content-Type': 'text/html', 'Content-Length': str(len(PAGE)),
+    }, PAGE), 'Архив должен вернуть записанный ответ без заголовков передачи'
+    with pytest.raises(LookupError):
+        http_archive.replay('HEAD', 'https://peps.python.org/')
+
+
+def test_replay_missing_archive(tmp_path, http_archive):
+    with pytest.raises(FileNotFoundError):
+        http_archive.open(tmp_path / 'missing.sqlite', replay=True)
+    assert not http_archive.recording
+
+
+class ConnectionWithoutBlobs:
+    # sqlite3 before python 3.11 has no blobopen
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, *args):
+        return self.connection.execute(*args)
+
+
+@pytest.mark.parametrize('blobs', [True, False])
+def test_record_file(tmp_path, http_archive, blobs):
+    page = tmp_path / 'page.html'
+    page.write_bytes(PAGE)
+    http_archive.open(tmp_path / 'run.sqlite')
+    connection = http_archive.connection
+    if not blobs:
+        http_archive.connection = ConnectionWithoutBlobs(connection)
+    http_archive.record_file(
+        'GET', 'https://docs.python.org/3/docs.zip', 200, 'OK',
+        {'Transfer-Encoding': 'chunked'}, page
+    )
+    http_archive.connection = connection
+    assert http_archive.replay(
+        'GET', 'https://docs.python.org/3/docs.zip'
+    ) == archive.Exchange(200, 'OK', {'Content-Length': str(len(PAGE))}, PAGE)
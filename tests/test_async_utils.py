@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+from requests_cache import CachedSession
+from conftest import get_pep_pages
+try:
+    from src import async_utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `async_utils.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `async_utils.py`'
+
+
+def fetch(session, url, times=1):
+    async def _fetch():
+        async with async_utils.async_client(2) as client:
+            return [
+                await async_utils.get_response_async(client, session, url)
+                for _ in range(times)
+            ]
+    return asyncio.run(_fetch())
+
+
+def test_get_response_async(local_server, tempfile_session):
+    base_url, requested = local_server(get_pep_pages())
+    got = fetch(tempfile_session, base_url, times=2)
+    assert [response.status_code for response in got] == [200, 200]
+    assert 'Numerical Index' in got[0].text, (
+        'Функция `get_response_async` должна возвращать '
+        'страницу в кодировке utf-8'
+    )
+    assert requested == [''], (
+        'Повторный запрос страницы должен обслуживаться из кеша сессии'
+    )
+    assert tempfile_session.cache.contains(url=base_url)
+
+
+def test_get_response_async_connection_error(tempfile_session):
+    with pytest.raises(ConnectionError):
+        fetch(tempfile_session, 'http://127.0.0.1:9/')
+
+
+def test_get_response_async_revalidates(local_server):
+    base_url, requested = local_server(get_pep_pages())
+    session = CachedSession(backend='memory', expire_after=0)
+    first, second = fetch(session, base_url, times=2)
+    assert requested == ['', ''], (
+        'Устаревшая страница должна перепроверяться условным запросом'
+    )
+    assert second.status_code == 200 and second.text == first.text
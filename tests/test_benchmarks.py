@@ -0,0 +1,85 @@
+import json
+import sys
+
+from conftest import BASE_DIR
+
+sys.path.append(str(BASE_DIR / 'benchmarks'))
+try:
+    from benchmarks import extraction, run, scaling
+except ImportError:
+    assert False, (
+        'Убедитесь что в директории `benchmarks` есть файлы `run.py`, '
+        '`scaling.py` и `extraction.py`'
+    )
+
+
+def test_benchmark_report(tmp_path):
+    output = tmp_path / 'report.json'
+    run.run([
+        'pep', 'latest-versions', '--pep-source', 'html',
+        '--peps', '10', '--versions', '3', '--output', str(output)
+    ])
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert list(report['modes']) == ['pep', 'latest-versions']
+    cold = report['modes']['pep']['cold']
+    assert cold['requests'] == 11, (
+        'Холодный прогон `pep` должен запросить каталог и все карточки'
+    )
+    assert cold['pages_parsed'] == 11
+    assert cold['peak_memory_mib'] > 0
+    assert report['modes']['pep']['warm']['requests'] == 0, (
+        'Тёплый прогон должен обслуживаться из кеша'
+    )
+
+
+def test_benchmark_json_source(tmp_path):
+    output = tmp_path / 'report.json'
+    run.run(['pep', '--peps', '10', '--output', str(output)])
+    report = json.loads(output.read_text(encoding='utf-8'))
+    cold = report['modes']['pep']['cold']
+    assert cold['requests'] == 1, (
+        'Режим `pep` с JSON-каталогом должен делать один запрос'
+    )
+    assert cold['pages_parsed'] == 0
+
+
+def test_scaling_report(tmp_path):
+    output = tmp_path / 'scaling.json'
+    scaling.run([
+        'whats-new', '--versions', '3', '--processes', '1', '2',
+        '--output', str(output)
+    ])
+    report = json.loads(output.read_text(encoding='utf-8'))
+    runs = report['modes']['whats-new']
+    assert list(runs) == ['1', '2']
+    assert runs['1']['speedup'] == 1.0
+
+
+def test_benchmark_extract_cache(tmp_path):
+    output = tmp_path / 'report.json'
+    run.run([
+        'pep', '--pep-source', 'html', '--extract-cache', '--peps', '10',
+        '--output', str(output)
+    ])
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert report['modes']['pep']['warm']['pages_parsed'] == 1, (
+        'С кешем извлечений тёплый прогон должен разбирать только каталог'
+    )
+
+
+def test_extraction_report(tmp_path):
+    output = tmp_path / 'extraction.json'
+    extraction.run([
+        '--peps', '10', '--versions', '3', '--repeat', '2',
+        '--output', str(output)
+    ])
+    report = json.loads(output.read_text(encoding='utf-8'))
+    assert list(report['pages']) == [
+        'pep-index', 'pep-card', 'whats-new-index', 'whats-new-version',
+        'latest-versions',
+    ]
+    for kind, result in report['pages'].items():
+        assert result['same_fields'], (
+            f'Описание `{kind}` должно извлекать то же, что и ручной разбор'
+        )
+        assert result['spec-lxml']['total_ms'] > 0
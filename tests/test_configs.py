@@ -29,7 +29,7 @@ def test_configs_file():
     ),
     (
         argparse._StoreAction, ['-o', '--output'], 'output',
-        ('pretty', 'file'),
+        ('pretty', 'file', 'sqlite', 'parquet'),
         'Дополнительные способы вывода данных'
     ),
 ])
@@ -64,3 +64,142 @@ def test_configure_argument_parser(
     assert got_action.help == help_str, (
         f'Укажите help-строку cli аргумента {got_action.dest}'
     )
+
+
+@pytest.mark.parametrize('argv, expire_after, first_pattern', [
+    ([], -1, None),
+    (['--ttl', 'peps.python.org/=0'], -1, ('peps.python.org/', 0)),
+    (['--cache-policy', 'revalidate'], 24 * 60 * 60,
+     ('peps.python.org/pep-*', 24 * 60 * 60)),
+    (['--cache-policy', 'revalidate', '--ttl', 'docs.python.org/3/=60'],
+     24 * 60 * 60, ('docs.python.org/3/', 60)),
+])
+def test_configure_cache(argv, expire_after, first_pattern):
+    args = configs.configure_argument_parser(['pep']).parse_args(
+        ['pep', *argv]
+    )
+    got = configs.configure_cache(args)
+    assert got['expire_after'] == expire_after
+    assert next(iter(got['urls_expire_after'].items()), None) == (
+        first_pattern
+    ), 'Шаблоны из `--ttl` должны иметь приоритет над стандартными'
+
+
+def test_url_ttl_error():
+    with pytest.raises(argparse.ArgumentTypeError):
+        configs.url_ttl('peps.python.org')
+
+
+def test_several_modes():
+    args = configs.configure_argument_parser(
+        ['pep', 'download', 'all']
+    ).parse_args(['pep', 'download', '-j'])
+    assert args.mode == ['pep', 'download']
+    assert args.concurrent_modes
+    with pytest.raises(SystemExit):
+        configs.configure_argument_parser(['pep']).parse_args(['pep', 'x'])
+
+
+@pytest.mark.parametrize('argv, backend, wal', [
+    ([], 'sqlite', True),
+    (['--cache-backend', 'filesystem'], 'filesystem', None),
+    (['--cache-backend', 'memory'], 'memory', None),
+    (['--replay', 'run.sqlite'], 'memory', None),
+])
+def test_configure_cache_backend(tmp_path, argv, backend, wal):
+    args = configs.configure_argument_parser(['pep']).parse_args(
+        ['pep', '--cache-path', str(tmp_path / 'cache'), *argv]
+    )
+    got = configs.configure_cache(args)
+    assert got['backend'] == backend
+    assert got['cache_name'] == str(tmp_path / 'cache')
+    assert got.get('wal') == wal, 'SQLite-кеш должен работать в режиме WAL'
+
+
+def test_record_or_replay():
+    parser = configs.configure_argument_parser(['pep'])
+    args = parser.parse_args(['pep', '--record', 'run.sqlite'])
+    assert not configs.configure_session(args)['replay']
+    args = parser.parse_args(['pep', '--replay', 'run.sqlite'])
+    assert configs.configure_session(args)['replay']
+    with pytest.raises(SystemExit):
+        parser.parse_args(['pep', '--record', 'a', '--replay', 'b'])
+
+
+def test_live_versions():
+    parser = configs.configure_argument_parser(['whats-new'])
+    assert parser.parse_args(['whats-new']).live_versions == 2
+    args = parser.parse_args(['whats-new', '-i', '--live-versions', '3'])
+    assert args.incremental and args.live_versions == 3
+    with pytest.raises(SystemExit):
+        parser.parse_args(['whats-new', '--live-versions', '0'])
+
+
+def test_throttle_arguments():
+    parser = configs.configure_argument_parser(['pep'])
+    args = parser.parse_args(['pep'])
+    assert (args.rate, args.retries) == (20, 3)
+    args = parser.parse_args(['pep', '--rate', '2.5', '--retries', '0'])
+    assert (args.rate, args.retries) == (2.5, 0)
+    for argv in (['--rate', '0'], ['--retries', '-1']):
+        with pytest.raises(SystemExit):
+            parser.parse_args(['pep', *argv])
+
+
+@pytest.mark.parametrize('since, valid', [
+    ('2024-02-01', True),
+    ('2024-02-01_10-00-00', True),
+    ('yesterday', False),
+])
+def test_since(since, valid):
+    parser = configs.configure_argument_parser(['pep-changes'])
+    if not valid:
+        with pytest.raises(SystemExit):
+            parser.parse_args(['pep-changes', '--since', since])
+        return
+    assert parser.parse_args(['pep-changes', '--since', since]).since == since
+
+
+def test_watch_intervals():
+    parser = configs.configure_argument_parser(['pep', 'whats-new'])
+    args = parser.parse_args(['pep', 'whats-new', '--watch'])
+    assert configs.watch_intervals(args, ['pep', 'whats-new']) == {
+        'pep': 300, 'whats-new': 300,
+    }
+    args = parser.parse_args([
+        'pep', 'whats-new', '--watch',
+        '--interval', '60', '--interval', 'pep=3600',
+    ])
+    assert configs.watch_intervals(args, ['pep', 'whats-new']) == {
+        'pep': 3600, 'whats-new': 60,
+    }, 'Интервал режима важнее общего интервала'
+    for interval in ('0', 'pep=soon'):
+        with pytest.raises(SystemExit):
+            parser.parse_args(['pep', '--watch', '--interval', interval])
+
+
+@pytest.mark.parametrize('argv, policy', [
+    (['pep'], 'keep'),
+    (['pep', '--watch'], 'revalidate'),
+    (['pep', '--watch', '--cache-policy', 'keep'], 'keep'),
+])
+def test_cache_policy(argv, policy):
+    parser = configs.configure_argument_parser(['pep'])
+    assert configs.cache_policy(parser.parse_args(argv)) == policy
+
+
+@pytest.mark.parametrize('serve, address', [
+    ('8080', ('127.0.0.1', 8080)),
+    ('0.0.0.0:8000', ('0.0.0.0', 8000)),
+    ('localhost:http', None),
+    ('70000', None),
+])
+def test_serve_address(serve, address):
+    parser = configs.configure_argument_parser(['pep'])
+    if address is None:
+        with pytest.raises(SystemExit):
+            parser.parse_args(['pep', '--serve', serve])
+        return
+    args = parser.parse_args(['pep', '--serve', serve])
+    assert args.serve == address
+    assert configs.cache_policy(args) == 'revalidate'
@@ -0,0 +1,132 @@
+import pytest
+import requests_mock
+try:
+    from src import downloads
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `downloads.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `downloads.py`'
+
+ARCHIVE_URL = 'https://docs.python.org/3/archives/python-docs-pdf-a4.zip'
+ARCHIVE = bytes(range(256)) * 1024
+ETAG = '"archive-v1"'
+
+
+def serve_archive(request, context):
+    context.headers['ETag'] = ETAG
+    range_header = request.headers.get('Range')
+    if range_header and request.headers.get('If-Range') == ETAG:
+        offset = int(range_header.split('=')[1].rstrip('-'))
+        if offset >= len(ARCHIVE):
+            context.status_code = 416
+            return b''
+        context.status_code = 206
+        return ARCHIVE[offset:]
+    return ARCHIVE
+
+
+@pytest.fixture
+def archive_session(tempfile_session):
+    adapter = requests_mock.Adapter()
+    adapter.register_uri(
+        'HEAD',
+        ARCHIVE_URL,
+        headers={'ETag': ETAG, 'Content-Length': str(len(ARCHIVE))},
+    )
+    adapter.register_uri('GET', ARCHIVE_URL, content=serve_archive)
+    tempfile_session.mount('https://docs.python.org/', adapter)
+    tempfile_session.archive_adapter = adapter
+    return tempfile_session
+
+
+def archive_gets(session):
+    return [
+        request for request in session.archive_adapter.request_history
+        if request.method == 'GET'
+    ]
+
+
+def test_download_file(archive_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    assert downloads.download_file(archive_session, ARCHIVE_URL, path)
+    assert path.read_bytes() == ARCHIVE
+    assert not archive_session.cache.contains(url=ARCHIVE_URL), (
+        'Архив не должен сохраняться в кеш сессии'
+    )
+    assert not downloads.download_file(archive_session, ARCHIVE_URL, path), (
+        'Совпадающий с сервером архив не должен загружаться повторно'
+    )
+    assert len(archive_gets(archive_session)) == 1
+
+
+def test_download_file_corrupted_copy(archive_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    downloads.download_file(archive_session, ARCHIVE_URL, path)
+    path.write_bytes(b'\0' * len(ARCHIVE))
+    assert downloads.download_file(archive_session, ARCHIVE_URL, path), (
+        'Архив с неверной контрольной суммой должен загружаться заново'
+    )
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_download_file_resume(archive_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    (tmp_path / 'python-docs-pdf-a4.zip.part').write_bytes(ARCHIVE[:1000])
+    downloads.download_file(archive_session, ARCHIVE_URL, path)
+    assert archive_gets(archive_session)[0].headers['Range'] == (
+        'bytes=1000-'
+    ), 'Прерванная загрузка должна продолжаться запросом с Range'
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_download_file_complete_part(archive_session, tmp_path):
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    # the previous run died between the last chunk and the rename
+    (tmp_path / 'python-docs-pdf-a4.zip.part').write_bytes(ARCHIVE)
+    assert downloads.download_file(archive_session, ARCHIVE_URL, path)
+    assert archive_gets(archive_session)[0].headers['Range'] == (
+        f'bytes={len(ARCHIVE) - 1}-'
+    ), 'Докачанный файл должен подтверждаться запросом последнего байта'
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_download_file_restarts_after_416(archive_session, tmp_path):
+    archive_session.archive_adapter.register_uri(
+        'HEAD', ARCHIVE_URL, headers={'ETag': ETAG}
+    )
+    path = tmp_path / 'python-docs-pdf-a4.zip'
+    (tmp_path / 'python-docs-pdf-a4.zip.part').write_bytes(ARCHIVE + b'junk')
+    assert downloads.download_file(archive_session, ARCHIVE_URL, path)
+    assert [
+        request.headers.get('Range')
+        for request in archive_gets(archive_session)
+    ] == [f'bytes={len(ARCHIVE) + 4}-', None], (
+        'После ответа 416 архив должен загружаться с начала'
+    )
+    assert path.read_bytes() == ARCHIVE
+
+
+def test_download_file_recorded(monkeypatch, archive_session, tmp_path):
+    from archive import http_archive
+    http_archive.open(tmp_path / 'run.sqlite')
+    recorded_bodies = []
+    record = http_archive.record
+
+    def counted_record(*exchange):
+        recorded_bodies.append(exchange[-1])
+        record(*exchange)
+
+    monkeypatch.setattr(http_archive, 'record', counted_record)
+    try:
+        downloads.download_file(
+            archive_session, ARCHIVE_URL, tmp_path / 'docs.zip'
+        )
+        assert recorded_bodies == [b''], (
+            'Тело архива должно записываться из файла, а не из памяти'
+        )
+        assert http_archive.replay('GET', ARCHIVE_URL).body == ARCHIVE
+        assert http_archive.replay('HEAD', ARCHIVE_URL).headers[
+            'Content-Length'
+        ] == str(len(ARCHIVE))
+    finally:
+        http_archive.close()
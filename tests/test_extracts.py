@@ -0,0 +1,88 @@
+import pytest
+from requests_cache import CachedSession
+from conftest import PEP_INDEX_URL, get_pep_adapter
+try:
+    from src import extracts, main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extracts.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `extracts.py`'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = extracts.ExtractCache()
+    cache.open(tmp_path / 'extracts.sqlite')
+    yield cache
+    cache.close()
+
+
+def counting_extractor(version):
+    calls = []
+
+    @extracts.extractor(version)
+    def extract(source, text):
+        calls.append(source)
+        return (source, text.upper())
+    return extract, calls
+
+
+def run(cache, extract, pages):
+    return list(cache.extract_pages(
+        extract, pages, lambda misses: (extract(*page) for page in misses)
+    ))
+
+
+def test_extract_cache_skips_unchanged_pages(cache):
+    extract, calls = counting_extractor(version=1)
+    pages = [('a', 'first'), ('b', 'second'), ('c', 'third')]
+    first = run(cache, extract, pages)
+    calls.clear()
+    pages[1] = ('b', 'changed')
+    got = run(cache, extract, pages)
+    assert calls == ['b'], (
+        'Заново должны разбираться только изменившиеся страницы'
+    )
+    assert got == [first[0], ('b', 'CHANGED'), first[2]], (
+        'Записи из кеша и разобранные должны идти в порядке страниц'
+    )
+
+
+def test_extract_cache_version(cache):
+    extract, _ = counting_extractor(version=1)
+    run(cache, extract, [('a', 'page')])
+    bumped, calls = counting_extractor(version=2)
+    run(cache, bumped, [('a', 'page')])
+    assert calls == ['a'], (
+        'Новая версия функции разбора не должна брать старые записи'
+    )
+
+
+def test_extract_cache_eviction(tmp_path):
+    cache = extracts.ExtractCache()
+    cache.open(tmp_path / 'extracts.sqlite', max_entries=2)
+    extract, _ = counting_extractor(version=1)
+    run(cache, extract, [('a', '1'), ('b', '2'), ('c', '3')])
+    count, = cache.connection.execute(
+        'SELECT COUNT(*) FROM extracts'
+    ).fetchone()
+    cache.close()
+    assert count == 2, 'Кеш извлечений должен ограничивать число записей'
+
+
+def test_pep_uses_extract_cache(tmp_path):
+    session = CachedSession(backend='memory')
+    session.mount(PEP_INDEX_URL, get_pep_adapter())
+    main.extract_cache.open(tmp_path / 'extracts.sqlite')
+    try:
+        first = main.pep(session, pep_source='html')
+        main.registry.reset()
+        assert main.pep(session, pep_source='html') == first
+        summary = main.registry.to_dict()
+    finally:
+        main.extract_cache.close()
+        main.registry.reset()
+    assert summary['counters']['extract_cache_hits'] == 5, (
+        'Карточки из кеша HTTP не должны разбираться повторно'
+    )
+    assert 'extract_pep' not in summary['stages']
@@ -0,0 +1,94 @@
+import pytest
+try:
+    from src import history
+    from src.peps import Pep
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `history.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `history.py`'
+
+
+def pep(number, actual_status, preview_status=None):
+    return Pep(
+        number=number,
+        url=f'https://peps.python.org/pep-{int(number):04}/',
+        preview_status=preview_status or actual_status,
+        actual_status=actual_status,
+    )
+
+
+@pytest.fixture
+def pep_history(tmp_path):
+    pep_history = history.PepHistory()
+    pep_history.open(tmp_path / 'store' / 'pep_history.sqlite')
+    yield pep_history
+    pep_history.close()
+
+
+def test_record_transitions(pep_history):
+    assert pep_history.record(
+        [pep('1', 'Active'), pep('8', 'Draft')], run='2024-01-01_10-00-00'
+    ) == 2
+    # the card of PEP 8 did not load, it is not a removal
+    assert pep_history.record(
+        [pep('1', 'Active')], run='2024-01-02_10-00-00'
+    ) == 0
+    assert pep_history.record(
+        [pep('0001', 'Active'), pep('8', 'Final', 'Accepted')],
+        run='2024-02-01_10-00-00'
+    ) == 1
+    assert pep_history.changes() == [
+        (8, 'Draft', 'Final', '2024-02-01_10-00-00'),
+    ], 'По умолчанию нужны смены статуса последнего запуска'
+    assert pep_history.changes('2024-01-01') == [
+        (1, None, 'Active', '2024-01-01_10-00-00'),
+        (8, None, 'Draft', '2024-01-01_10-00-00'),
+        (8, 'Draft', 'Final', '2024-02-01_10-00-00'),
+    ], 'Дата должна отбирать все запуски начиная с неё'
+    assert pep_history.changes('2024-01-02_10-00-00') == [
+        (8, 'Draft', 'Final', '2024-02-01_10-00-00'),
+    ]
+    assert pep_history.mismatches() == [
+        (8, 'Accepted', 'Final', '2024-02-01_10-00-00'),
+    ]
+
+
+def test_record_json_source(pep_history):
+    pep_history.record(
+        [pep('8', 'Final', 'Accepted')], run='2024-01-01_10-00-00'
+    )
+    json_pep = Pep('8', 'https://peps.python.org/pep-0008/', None, 'Final')
+    assert pep_history.record([json_pep], run='2024-01-02_10-00-00') == 0
+    assert pep_history.mismatches() == [], (
+        'Без статуса каталога несовпадение не определяется'
+    )
+
+
+def test_record_without_database():
+    assert history.PepHistory().record([pep('1', 'Active')]) == 0
+
+
+def query_plan(pep_history, query, *parameters):
+    return ' '.join(
+        row[-1] for row in pep_history.connection.execute(
+            f'EXPLAIN QUERY PLAN {query}', parameters
+        )
+    )
+
+
+def test_queries_use_indexes(pep_history):
+    for day in range(1, 29):
+        pep_history.record(
+            [
+                pep(str(number), 'Final' if (number + day) % 7 else 'Draft')
+                for number in range(700)
+            ],
+            run=f'2024-02-{day:02}_10-00-00'
+        )
+    assert 'sqlite_autoindex_transitions_1' in query_plan(
+        pep_history, history.CHANGES_QUERY, '2024-02-28'
+    ), 'Запрос изменений должен идти по первичному ключу transitions'
+    assert 'current_mismatches' in query_plan(
+        pep_history, history.MISMATCHES_QUERY
+    ), 'Запрос несовпадений должен идти по индексу current_mismatches'
+    assert len(pep_history.changes('2024-02-28')) == 200
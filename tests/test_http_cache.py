@@ -0,0 +1,75 @@
+import datetime as dt
+
+import pytest
+import requests_mock
+from requests_cache import CachedSession
+try:
+    from src import configs, http_cache, main
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `http_cache.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `http_cache.py`'
+
+PAGES = ('a', 'b', 'c')
+
+
+def cached_session(tmp_path, backend):
+    # the settings of a real run, WAL mode of SQLite included
+    args = configs.configure_argument_parser(['cache']).parse_args([
+        'cache', '--cache-backend', backend,
+        '--cache-path', str(tmp_path / 'http_cache'),
+    ])
+    session = CachedSession(**configs.configure_backend(args))
+    adapter = requests_mock.Adapter()
+    for page in PAGES:
+        adapter.register_uri(
+            'GET', f'https://example.com/{page}', text=page * 10000
+        )
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch(session, page):
+    response = session.get(f'https://example.com/{page}')
+    http_cache.access_log.touch(response.cache_key)
+    return response
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'filesystem'])
+def test_evict_least_recently_read(tmp_path, backend):
+    session = cached_session(tmp_path, backend)
+    for page in (*PAGES, 'a'):
+        fetch(session, page)
+    http_cache.access_log.flush(session.cache)
+    entries = http_cache.backend(session.cache)['entries'](session.cache)
+    total = sum(size for _, size, _ in entries)
+    assert http_cache.evict(session.cache, total - 1) == 1
+    assert [
+        session.cache.contains(url=f'https://example.com/{page}')
+        for page in PAGES
+    ] == [True, False, True], (
+        'Первой должна вытесняться страница, которую дольше всех не читали'
+    )
+
+
+@pytest.mark.parametrize('backend', ['sqlite', 'filesystem', 'memory'])
+def test_cache_maintenance(tmp_path, backend):
+    session = cached_session(tmp_path, backend)
+    stale = fetch(session, 'a')
+    fetch(session, 'b')
+    session.cache.save_response(
+        stale,
+        cache_key=stale.cache_key,
+        expires=dt.datetime.utcnow() - dt.timedelta(seconds=1)
+    )
+    got = dict(main.cache_maintenance(session)[1:])
+    assert got['Удалено устаревших'] == 1, (
+        'Обслуживание кеша должно удалять устаревшие записи'
+    )
+    assert got['Записей'] == 1
+    assert got['Размер до, байт'] >= 2 * len(stale.content), (
+        'Размер кеша должен учитывать страницы в журнале WAL'
+    )
+    assert 0 < got['Размер после, байт'] <= got['Размер до, байт'], (
+        'После очистки кеш не должен становиться больше'
+    )
@@ -0,0 +1,60 @@
+import json
+import subprocess
+import sys
+
+from conftest import SRC_DIR
+try:
+    from src import lazy
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `lazy.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `lazy.py`'
+
+HEAVY_MODULES = (
+    'aiohttp', 'asyncio', 'bs4', 'lxml', 'prettytable', 'requests',
+    'requests_cache', 'tqdm',
+)
+# runs main.py as a script, the modules end up on stderr after --help
+IMPORTED_MODULES = """
+import json, runpy, sys
+path, run_name, *args = sys.argv[1:]
+sys.argv = [path, *args]
+try:
+    runpy.run_path(path, run_name=run_name)
+except SystemExit:
+    pass
+print(json.dumps(sorted(sys.modules)), file=sys.stderr)
+"""
+
+
+def imported_modules(*args):
+    """Запускает main.py в отдельном интерпретаторе, тяжёлые модули в нём."""
+    process = subprocess.run(
+        [sys.executable, '-c', IMPORTED_MODULES, 'main.py', *args],
+        cwd=SRC_DIR, capture_output=True, text=True, timeout=60
+    )
+    assert process.returncode == 0, process.stderr
+    modules = json.loads(process.stderr.splitlines()[-1])
+    return process, [name for name in HEAVY_MODULES if name in modules]
+
+
+def test_lazy_from():
+    dumps = lazy.lazy_from('json', 'dumps')
+    assert dumps([1]) == json.dumps([1])
+    loads, decoder = lazy.lazy_from('json', 'loads', 'JSONDecoder')
+    assert loads('[1]') == [1]
+    assert decoder.__name__ == 'JSONDecoder'
+    assert lazy.lazy_import('json').loads('{}') == {}
+
+
+def test_main_import_skips_heavy_modules():
+    _, eager = imported_modules('main')
+    assert not eager, (
+        f'Модули {eager} должны импортироваться режимами, а не `main.py`'
+    )
+
+
+def test_help_skips_heavy_imports():
+    process, eager = imported_modules('__main__', '--help')
+    assert 'pep-changes' in process.stdout
+    assert not eager, f'Модули {eager} не нужны для --help'
@@ -1,5 +1,12 @@
+from collections import Counter
 import pytest
+import requests
+from argparse import Namespace
+import requests_mock
 from pathlib import Path
+from requests_cache import CachedSession
+from conftest import (PEP_INDEX_URL, get_pages_adapter, get_pep_json_pages,
+                      get_pep_pages, get_whats_new_pages)
 try:
     from src import main
 except ModuleNotFoundError:
@@ -31,7 +38,7 @@ def test_main_file():
 
 
 def test_whats_new(mock_session):
-    got = main.whats_new(mock_session)
+    got = list(main.whats_new(mock_session))
     header = ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
     assert isinstance(got, list), (
         'Функция `whats_new` должна возвращать объект типа `list`'
@@ -53,7 +60,7 @@ def test_whats_new(mock_session):
 
 @pytest.mark.skip()
 def test_latest_versions(mock_session):
-    got = main.latest_versions(mock_session)
+    got = list(main.latest_versions(mock_session))
     assert isinstance(got, list), (
         'Функция `latest_versions` должна возвращать объект типа `list`'
     )
@@ -140,3 +147,364 @@ def test_mode_to_function():
             'В модуле `main.py` в объекте `MODE_TO_FUNCTION` '
             f'нет значения {func}'
         )
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_pep(pep_session, workers):
+    got = main.pep(pep_session, workers=workers, pep_source='html')
+    assert got == [
+        ('Status', 'Number of PEPs'),
+        ('Active', 2),
+        ('Withdrawn', 1),
+        ('Final', 1),
+        ('Draft', 1),
+        ('Total', 5),
+    ], (
+        'Функция `pep` должна считать статусы в порядке каталога '
+        'при любом числе потоков'
+    )
+
+
+def test_pep_json_source(pep_session):
+    adapter = get_pages_adapter(get_pep_json_pages(), PEP_INDEX_URL)
+    json_session = CachedSession(backend='memory')
+    json_session.mount(PEP_INDEX_URL, adapter)
+    got = main.pep(json_session)
+    assert got == main.pep(pep_session, pep_source='html'), (
+        'JSON-каталог должен давать те же статусы, что и карточки'
+    )
+    assert len(adapter.request_history) == 1, (
+        'Режим `pep` с JSON-каталогом должен обходиться одним запросом'
+    )
+
+
+@pytest.mark.parametrize('json_page', [
+    {'status_code': 404, 'text': 'Not Found'},
+    {'status_code': 200, 'text': '<html>not json</html>'},
+    {'exc': requests.ConnectTimeout},
+])
+def test_pep_json_source_fallback(pep_session, json_page):
+    broken_adapter = requests_mock.Adapter()
+    broken_adapter.register_uri('GET', requests_mock.ANY, **json_page)
+    pep_session.mount(PEP_INDEX_URL + 'api/', broken_adapter)
+    assert main.pep(pep_session) == main.pep(pep_session, pep_source='html'), (
+        'Без JSON-каталога режим `pep` должен разбирать карточки'
+    )
+
+
+def test_pep_async_json_source(monkeypatch, local_server, tempfile_session):
+    base_url, requested = local_server(get_pep_json_pages())
+    monkeypatch.setattr(main, 'PEP_URL', base_url)
+    got = main.pep_async(tempfile_session)
+    assert ('Total', 5) in got
+    assert requested == ['api/peps.json']
+
+
+def test_pep_parse_processes(pep_session):
+    got = main.pep(
+        pep_session, workers=2, parse_processes=2, pep_source='html'
+    )
+    assert got == main.pep(pep_session, workers=2, pep_source='html'), (
+        'Разбор карточек в пуле процессов должен давать тот же результат'
+    )
+
+
+def test_whats_new_parse_processes(monkeypatch, local_server,
+                                   tempfile_session):
+    base_url, _ = local_server(get_whats_new_pages())
+    monkeypatch.setattr(main, 'WHATS_NEW_URL', base_url)
+    got = list(main.whats_new(tempfile_session, parse_processes=2))
+    assert got == list(main.whats_new(tempfile_session)), (
+        'Разбор страниц в пуле процессов должен сохранять порядок версий'
+    )
+    assert main.whats_new_async(tempfile_session, parse_processes=2) == got
+
+
+def test_pep_skips_unloaded_card(pep_session):
+    broken_adapter = requests_mock.Adapter()
+    broken_adapter.register_uri(
+        'GET', requests_mock.ANY, exc=requests.ConnectTimeout
+    )
+    pep_session.mount('https://peps.python.org/pep-0008/', broken_adapter)
+    got = main.pep(pep_session, workers=2, pep_source='html')
+    assert ('Total', 4) in got, (
+        'Ошибка загрузки одной карточки не должна прерывать режим `pep`'
+    )
+
+
+def test_pep_async(monkeypatch, local_server, tempfile_session):
+    base_url, requested = local_server(get_pep_pages())
+    monkeypatch.setattr(main, 'PEP_URL', base_url)
+    got = main.pep_async(tempfile_session, workers=3, pep_source='html')
+    assert got == main.pep(tempfile_session, workers=1, pep_source='html'), (
+        'Асинхронный режим `pep` должен совпадать с синхронным'
+    )
+    assert len(requested) == len(get_pep_pages()), (
+        'Синхронный режим должен брать страницы из кеша, '
+        'заполненного асинхронным'
+    )
+
+
+def test_whats_new_async(monkeypatch, local_server, tempfile_session):
+    base_url, _ = local_server(get_whats_new_pages())
+    monkeypatch.setattr(main, 'WHATS_NEW_URL', base_url)
+    got = main.whats_new_async(tempfile_session, workers=2)
+    assert got == list(main.whats_new(tempfile_session))
+    assert [row[1] for row in got[1:]] == [
+        'What’s New In Python 3.12¶',
+        'What’s New In Python 3.11¶',
+        'What’s New In Python 2.0¶',
+    ]
+
+
+@pytest.mark.parametrize('output', ['file', 'sqlite'])
+def test_failed_index_leaves_no_output(monkeypatch, tmp_path,
+                                       tempfile_session, output):
+    from src import outputs
+
+    def unreachable(session, url):
+        raise ConnectionError(url)
+
+    monkeypatch.setattr(main, 'make_tree', unreachable)
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+    with pytest.raises(ConnectionError):
+        outputs.control_output(
+            main.whats_new(tempfile_session),
+            Namespace(mode='whats-new', output=output)
+        )
+    assert list(tmp_path.rglob('*.*')) == [], (
+        'Режим, не загрузивший оглавление, не должен оставлять '
+        'файл или запуск в базе результатов'
+    )
+
+
+@pytest.mark.parametrize('mode', ['pep', 'pep_async'])
+def test_pep_incremental(monkeypatch, tmp_path, local_server, mode):
+    pages = get_pep_pages()
+    base_url, requested = local_server(pages)
+    monkeypatch.setattr(main, 'PEP_URL', base_url)
+    monkeypatch.setattr(main, 'SNAPSHOTS_DIR', tmp_path)
+    pep_mode = getattr(main, mode)
+    first = pep_mode(
+        CachedSession(backend='memory'), incremental=True, pep_source='html'
+    )
+    assert (tmp_path / 'pep.json').exists(), (
+        'Инкрементальный режим `pep` должен сохранять снимок результатов'
+    )
+    pages[''] = pages[''].replace('Process, Withdrawn', 'Process, Active')
+    requested.clear()
+    second = pep_mode(
+        CachedSession(backend='memory'), incremental=True, pep_source='html'
+    )
+    assert requested == ['', 'pep-0002/'], (
+        'Повторный запуск должен загружать только изменившиеся карточки'
+    )
+    assert second == first
+
+
+@pytest.mark.parametrize('mode', ['whats_new', 'whats_new_async'])
+def test_whats_new_incremental(monkeypatch, tmp_path, local_server, mode):
+    base_url, requested = local_server(get_whats_new_pages())
+    monkeypatch.setattr(main, 'WHATS_NEW_URL', base_url)
+    monkeypatch.setattr(main, 'SNAPSHOTS_DIR', tmp_path)
+    whats_new_mode = getattr(main, mode)
+    first_session = CachedSession(backend='memory', expire_after=60)
+    first = list(whats_new_mode(
+        first_session, incremental=True, live_versions=1
+    ))
+    assert (tmp_path / 'whats_new.json').exists(), (
+        'Инкрементальный режим `whats-new` должен сохранять снимок версий'
+    )
+    assert first_session.get(base_url + '2.0.html').expires is None, (
+        'Страницы старых версий должны кешироваться бессрочно'
+    )
+    assert first_session.get(base_url + '3.12.html').expires is not None
+    requested.clear()
+    second = list(whats_new_mode(
+        CachedSession(backend='memory'), incremental=True, live_versions=1
+    ))
+    assert requested == ['', '3.12.html'], (
+        'Повторный запуск должен загружать только оглавление '
+        'и страницы новейших версий'
+    )
+    assert second == first
+
+
+def test_pep_changes(monkeypatch, tmp_path, pep_session):
+    pep_history = main.pep_history
+    pep_history.open(tmp_path / 'pep_history.sqlite')
+    try:
+        main.pep(pep_session, workers=2, pep_source='html')
+        got = main.pep_changes(pep_session)
+    finally:
+        pep_history.close()
+    assert got[0] == ('PEP', 'Событие', 'Было', 'Стало', 'Запуск')
+    events = Counter(row[1] for row in got[1:])
+    assert events['Новый PEP'] == 5, (
+        'Первый запуск должен записать в историю все PEP'
+    )
+    assert events['Каталог/карточка'] > 0, (
+        'Режим `pep-changes` должен показывать несовпадения статусов'
+    )
+    assert 'pep-changes' in main.MAINTENANCE_MODE_TO_FUNCTION
+
+
+def test_pep_changes_sqlite_output(monkeypatch, tmp_path):
+    from src import outputs, store
+    from src.peps import Pep
+    url = 'https://peps.python.org/pep-0001/'
+    monkeypatch.setattr(outputs, 'BASE_DIR', tmp_path)
+    pep_history = main.pep_history
+    pep_history.open(tmp_path / 'pep_history.sqlite')
+    try:
+        for run, status in (('2024-01-01_10-00-00', 'Draft'),
+                            ('2024-01-02_10-00-00', 'Accepted'),
+                            ('2024-01-03_10-00-00', 'Final')):
+            pep_history.record([Pep('1', url, 'Active', status)], run=run)
+        rows = main.pep_changes(None, since='2024-01-01')
+    finally:
+        pep_history.close()
+    assert len(rows) == 5, 'Ожидались три события и несовпадение PEP 1'
+    db_path, run = outputs.sqlite_output(
+        rows, Namespace(mode='pep-changes', output='sqlite')
+    )
+    assert store.load_results(db_path, 'pep-changes', run) == rows, (
+        'Все события одного PEP должны сохраниться отдельными строками'
+    )
+
+
+def test_selected_modes():
+    assert main.selected_modes(['all']) == list(main.MODE_TO_FUNCTION)
+    assert main.selected_modes(['pep', 'download', 'pep']) == [
+        'pep', 'download'
+    ]
+    assert main.selected_modes(['all', 'cache', 'pep-changes', 'pep']) == [
+        *main.MODE_TO_FUNCTION, 'cache', 'pep-changes'
+    ]
+    assert main.selected_modes(['cache', 'all']) == [
+        'cache', *main.MODE_TO_FUNCTION
+    ]
+
+
+@pytest.mark.parametrize('concurrent', [False, True])
+def test_run_modes(monkeypatch, local_server, tempfile_session, capsys,
+                   concurrent):
+    base_url, _ = local_server(
+        {**get_whats_new_pages(), **get_pep_json_pages()}
+    )
+    monkeypatch.setattr(main, 'WHATS_NEW_URL', base_url)
+    monkeypatch.setattr(main, 'PEP_URL', base_url)
+
+    def broken_mode(session, **kwargs):
+        raise LookupError('broken')
+
+    monkeypatch.setitem(main.MODE_TO_FUNCTION, 'download', broken_mode)
+    main.run_modes(
+        tempfile_session,
+        [
+            Namespace(mode=mode, output=None, asyncio=False)
+            for mode in ('pep', 'download', 'whats-new')
+        ],
+        concurrent=concurrent,
+    )
+    out = capsys.readouterr().out
+    assert 'Total 5' in out, (
+        'Ошибка одного режима не должна прерывать остальные'
+    )
+    assert out.index('Total 5') < out.index('Ссылка на статью'), (
+        'Результаты режимов должны выводиться в заданном порядке'
+    )
+
+
+@pytest.mark.parametrize('engine', [[], ['--asyncio']])
+def test_watch_polls_revalidate(monkeypatch, local_server, tempfile_session,
+                                engine):
+    pages = get_whats_new_pages()
+    base_url, requested = local_server(pages)
+    monkeypatch.setattr(main, 'WHATS_NEW_URL', base_url)
+    from src import configs
+    args = configs.configure_argument_parser(['whats-new']).parse_args(
+        ['whats-new', '--watch', *engine]
+    )
+    mode_args = Namespace(**{**vars(args), 'mode': 'whats-new'})
+    poll = main.mode_poll(tempfile_session, args)
+    first = poll(mode_args)
+    assert poll(mode_args) == first
+    assert sorted(requested) == sorted([*pages, *pages]), (
+        'Каждый опрос должен перепроверять каждую страницу, '
+        'даже если запись кеша ещё свежа'
+    )
+    pages['3.12.html'] = pages['3.12.html'].replace('3.12', '3.13')
+    assert poll(mode_args) != first, (
+        'Опрос должен видеть изменения страницы до устаревания кеша'
+    )
+
+
+def test_watch_modes(monkeypatch, pep_session):
+    import os
+    import signal
+    from src import configs, watch
+    monkeypatch.setattr(watch, 'WATCH_TICK', 0.01)
+    args = configs.configure_argument_parser(['pep']).parse_args(
+        ['pep', '--watch', '--interval', '0.01', '--pep-source', 'html']
+    )
+    mode_args = Namespace(**{**vars(args), 'mode': 'pep'})
+    emitted = []
+    mode_results = main.mode_results
+
+    def counted_results(session, cli_args, buffered=False):
+        if len(polls) == 1:
+            os.kill(os.getpid(), signal.SIGTERM)
+        polls.append(cli_args.mode)
+        return mode_results(session, cli_args, buffered)
+
+    polls = []
+    monkeypatch.setattr(main, 'mode_results', counted_results)
+    monkeypatch.setattr(
+        main, 'output_results', lambda rows, _: emitted.append(rows)
+    )
+    main.watch_modes(pep_session, [mode_args], args)
+    assert polls == ['pep', 'pep'], 'Режим должен опрашиваться до сигнала'
+    assert len(emitted) == 1, (
+        'Повторный опрос без изменений не должен ничего выводить'
+    )
+
+
+def test_serve_modes(monkeypatch, local_server, tempfile_session):
+    import os
+    import signal
+    from src import configs, serve, watch
+    pages = get_whats_new_pages()
+    base_url, _ = local_server(pages)
+    monkeypatch.setattr(main, 'WHATS_NEW_URL', base_url)
+    monkeypatch.setattr(watch, 'WATCH_TICK', 0.01)
+    args = configs.configure_argument_parser(['whats-new']).parse_args(
+        ['whats-new', '--serve', '127.0.0.1:0', '--interval', '0.01']
+    )
+    modes_args = [
+        Namespace(**{**vars(args), 'mode': mode})
+        for mode in ('whats-new', 'download')
+    ]
+    etags = []
+
+    def download(session, **kwargs):
+        raise AssertionError('Режим без таблицы не должен опрашиваться')
+
+    class RecordedTables(serve.ResultTables):
+        def publish(self, mode, results):
+            super().publish(mode, results)
+            etags.append(self.get(mode).etag)
+            # the page changes while its cache entry is still fresh
+            pages['3.12.html'] = pages['3.12.html'].replace('3.12', '3.13')
+            if len(etags) == 2:
+                os.kill(os.getpid(), signal.SIGTERM)
+
+    monkeypatch.setattr(main, 'ResultTables', RecordedTables)
+    monkeypatch.setitem(main.MODE_TO_FUNCTION, 'download', download)
+    with pytest.raises(ValueError):
+        main.serve_modes(tempfile_session, modes_args[1:], args)
+    main.serve_modes(tempfile_session, modes_args, args)
+    assert len(etags) == 2
+    assert etags[0] != etags[1], (
+        'Обновление таблицы должно видеть изменившуюся страницу'
+    )
@@ -0,0 +1,60 @@
+import json
+from argparse import Namespace
+from pathlib import Path
+
+import pytest
+try:
+    from src import metrics, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `metrics.py`'
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = metrics.Metrics()
+    monkeypatch.setattr(metrics, 'registry', registry)
+    monkeypatch.setattr(utils, 'registry', registry)
+    return registry
+
+
+def test_cache_hit_ratio(registry, pep_session):
+    for _ in range(3):
+        utils.make_soup(pep_session, 'https://peps.python.org/pep-0008/')
+    got = registry.to_dict()
+    assert got['counters']['cache_misses'] == 1
+    assert got['counters']['cache_hits'] == 2
+    assert got['cache_hit_ratio'] == pytest.approx(2 / 3, abs=1e-4)
+    assert got['counters']['bytes_transferred'] > 0
+    assert got['stages']['fetch']['count'] == 3
+    assert got['stages']['parse']['count'] == 3
+
+
+def test_prometheus_histogram(registry):
+    registry.observe('parse', 0.003)
+    registry.observe('parse', 0.3)
+    registry.inc('cache_hits')
+    got = registry.to_prometheus()
+    assert 'bs4_parser_cache_hits_total 1' in got
+    assert 'bs4_parser_stage_seconds_bucket{stage="parse",le="0.005"} 1' in got
+    assert 'bs4_parser_stage_seconds_bucket{stage="parse",le="0.5"} 2' in got
+    assert 'bs4_parser_stage_seconds_count{stage="parse"} 2' in got
+
+
+@pytest.mark.parametrize('metrics_format, extension', [
+    ('json', '.json'),
+    ('prometheus', '.prom'),
+])
+def test_dump_metrics(monkeypatch, tmp_path, registry, metrics_format,
+                      extension):
+    monkeypatch.setattr(metrics, 'BASE_DIR', Path(tmp_path))
+    registry.observe('output', 0.01)
+    metrics.dump_metrics(Namespace(mode='pep', metrics=metrics_format))
+    files = list((tmp_path / 'metrics').iterdir())
+    assert len(files) == 1 and files[0].suffix == extension, (
+        'Метрики должны сохраняться в директорию `metrics`'
+    )
+    if metrics_format == 'json':
+        got = json.loads(files[0].read_text(encoding='utf-8'))
+        assert got['stages']['output']['count'] == 1
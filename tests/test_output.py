@@ -1,3 +1,4 @@
+import sqlite3
 from datetime import datetime
 from typing import Optional
 from pathlib import Path
@@ -90,3 +91,49 @@ def test_output_file():
     assert hasattr(outputs, 'file_output'), (
         'Напишите функцию `file_output` в модуле `output.py`'
     )
+
+
+def test_control_output_file_streams_rows(monkeypatch, tmp_path):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    written_before_last_row = []
+
+    def rows():
+        yield ('Статус', 'Количество')
+        yield ('Active', 1)
+        csv_file = next((tmp_path / 'results').iterdir())
+        written_before_last_row.append(csv_file.read_text(encoding='utf-8'))
+        yield ('Total', 1)
+
+    outputs.control_output(rows(), cli_args('pep', 'file'))
+    assert written_before_last_row == ['"Статус","Количество"\n'
+                                       '"Active","1"\n'], (
+        'Функция `file_output` должна записывать строки по мере поступления'
+    )
+
+
+@pytest.mark.parametrize('output_format, part_output', [
+    (None, 'Total 1'),
+    ('pretty', '| Total  | 1          |'),
+])
+def test_control_output_accepts_iterables(capsys, output_format,
+                                          part_output):
+    rows = iter([('Статус', 'Количество'), ('Total', 1)])
+    outputs.control_output(rows, cli_args('pep', output_format))
+    captured_out, _ = capsys.readouterr()
+    assert part_output in captured_out
+
+
+def test_control_output_sqlite(monkeypatch, tmp_path, records):
+    monkeypatch.setattr(outputs, 'BASE_DIR', Path(tmp_path))
+    outputs.control_output(iter(records('pep')), cli_args('pep', 'sqlite'))
+    outputs.control_output(iter(records('pep')), cli_args('pep', 'sqlite'))
+    assert not (tmp_path / 'results').exists(), (
+        'База результатов не должна попадать в директорию `results`'
+    )
+    db_path = tmp_path / 'store' / 'results.sqlite'
+    with sqlite3.connect(db_path) as connection:
+        runs = connection.execute('SELECT run FROM runs').fetchall()
+    run = runs[-1][0]
+    assert outputs.load_results(db_path, 'pep', run) == [
+        tuple(row) for row in records('pep')
+    ]
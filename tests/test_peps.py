@@ -0,0 +1,78 @@
+import pickle
+import sys
+
+import pytest
+from conftest import (PEP_CARD_STATUSES, PEP_INDEX_URL, PEP_JSON_PATH,
+                      get_pep_json_pages, get_pep_pages)
+try:
+    from src import peps
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `peps.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `peps.py`'
+
+
+@pytest.fixture
+def index():
+    return peps.parse_index(get_pep_pages()[''], PEP_INDEX_URL)
+
+
+def test_parse_index(index):
+    assert [fields['number'] for fields in index] == [
+        '1', '2', '8', '20', '736'
+    ]
+    assert index[3] == {
+        'number': '20',
+        'url': 'https://peps.python.org/pep-0020/',
+        'preview_status': 'Accepted',
+    }
+
+
+def test_parse_json_index():
+    got = peps.parse_json_index(
+        get_pep_json_pages()[PEP_JSON_PATH], PEP_INDEX_URL
+    )
+    assert [pep.number for pep in got] == ['1', '2', '8', '20', '736'], (
+        'Записи JSON-каталога должны идти в порядке номеров PEP'
+    )
+    assert got[2] == peps.Pep(
+        '8', 'https://peps.python.org/pep-0008/', None, 'Final'
+    ), 'В JSON-каталоге нет статуса каталога, только статус карточки'
+
+
+def test_extract_pep(index):
+    got = peps.extract_pep(index[2], get_pep_pages()['pep-0008/'])
+    assert got == peps.Pep(
+        '8', 'https://peps.python.org/pep-0008/', 'Final', 'Final'
+    )
+
+
+def test_extract_pep_without_status(index):
+    with pytest.raises(peps.ParserFindTagException):
+        peps.extract_pep(index[0], '<html><dl></dl></html>')
+
+
+def test_pep_record_is_compact(index, pep_session):
+    records = peps.load_peps(pep_session, index, workers=2)
+    assert [pep.actual_status for pep in records] == list(
+        PEP_CARD_STATUSES.values()
+    )
+    assert not hasattr(records[0], '__dict__'), (
+        'Запись PEP не должна заводить `__dict__` на каждый экземпляр'
+    )
+    assert sys.getsizeof(records[0]) < 100
+    assert pickle.loads(pickle.dumps(records)) == records, (
+        'Записи PEP должны сериализоваться pickle'
+    )
+
+
+def test_load_peps_reuses_snapshot(index, pep_session):
+    snapshot = {
+        fields['url']: dict(fields, actual_status='Cached')
+        for fields in index[:4]
+    }
+    got = peps.load_peps(pep_session, index, workers=2, snapshot=snapshot)
+    assert [pep.actual_status for pep in got] == [
+        'Cached', 'Cached', 'Cached', 'Cached', 'Draft'
+    ]
+    assert not pep_session.cache.contains(url=index[0]['url'])
@@ -0,0 +1,67 @@
+import json
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+try:
+    from src import serve
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `serve.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `serve.py`'
+
+PEP_RESULTS = [('Статус', 'Количество'), ('Active', 1), ('Всего', 1)]
+
+
+@pytest.fixture
+def result_server():
+    tables = serve.ResultTables(['pep', 'download'])
+    with serve.ResultServer(('127.0.0.1', 0), tables) as server:
+        yield tables, 'http://127.0.0.1:{}/'.format(server.server_port)
+
+
+def fetch(url, **headers):
+    try:
+        with urlopen(Request(url, headers=headers), timeout=5) as response:
+            return response.status, response.headers, response.read()
+    except HTTPError as error:
+        return error.code, error.headers, error.read()
+
+
+def test_publish_keeps_etag_of_unchanged_rows():
+    tables = serve.ResultTables(['pep'])
+    assert tables.get('pep') is None
+    with pytest.raises(KeyError):
+        tables.get('whats-new')
+    tables.publish('pep', PEP_RESULTS)
+    first = tables.get('pep')
+    tables.publish('pep', [list(row) for row in PEP_RESULTS])
+    assert tables.get('pep') is first, (
+        'Неизменившиеся строки не должны менять ответ и его ETag'
+    )
+    tables.publish('pep', [*PEP_RESULTS[:2], ('Всего', 2)])
+    assert tables.get('pep').etag != first.etag
+
+
+def test_serve_results(result_server):
+    tables, url = result_server
+    status, headers, _ = fetch(url + 'pep')
+    assert status == 503, 'До первого опроса сервер должен отвечать 503'
+    assert headers['Retry-After']
+    assert fetch(url + 'whats-new')[0] == 404
+    tables.publish('pep', PEP_RESULTS)
+    tables.publish('download', None)
+    status, headers, body = fetch(url + 'pep?format=json')
+    assert status == 200
+    assert headers['Content-Type'] == serve.JSON_TYPE
+    table = json.loads(body)
+    assert table['header'] == list(PEP_RESULTS[0])
+    assert table['rows'] == [list(row) for row in PEP_RESULTS[1:]]
+    status, _, body = fetch(url + 'pep', **{'If-None-Match': headers['ETag']})
+    assert (status, body) == (304, b''), (
+        'Для совпавшего ETag нужен ответ 304 без тела'
+    )
+    assert fetch(url + 'download')[0] == 404, (
+        'Режим без таблицы не должен отдаваться'
+    )
+    assert json.loads(fetch(url)[2]) == {'modes': {'pep': '/pep'}}
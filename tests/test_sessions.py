@@ -0,0 +1,95 @@
+import pytest
+from requests.adapters import HTTPAdapter
+try:
+    from src import configs, sessions, utils
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `sessions.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `sessions.py`'
+
+
+def test_make_session(local_server):
+    session = sessions.make_session(
+        pool_size=24, timeouts=(2, 7), backend='memory'
+    )
+    adapter = session.get_adapter('https://peps.python.org/').adapter
+    assert isinstance(adapter, sessions.TimeoutAdapter)
+    assert adapter._pool_maxsize == 24, (
+        'Размер пула соединений должен совпадать с числом загрузок'
+    )
+    assert sessions.session_timeouts(session) == (2, 7)
+    base_url, _ = local_server({'': 'page'})
+    assert session.get(base_url).text == 'page'
+
+
+@pytest.fixture
+def http_archive():
+    yield utils.http_archive
+    utils.http_archive.close()
+
+
+def test_record_and_replay(tmp_path, local_server, http_archive):
+    path = tmp_path / 'run.sqlite'
+    base_url, requested = local_server({'': 'page', 'pep-0008/': 'PEP 8'})
+    http_archive.open(path)
+    session = sessions.make_session(backend='memory')
+    for url in (base_url, base_url + 'pep-0008/', base_url):
+        utils.get_response(session, url)
+    http_archive.record(
+        'HEAD', base_url + 'docs.zip', 200, 'OK', {'Content-Length': '9'}, b''
+    )
+    http_archive.close()
+    http_archive.open(path, replay=True)
+    session = sessions.make_session(backend='memory', replay=True)
+    assert isinstance(
+        session.get_adapter(base_url), sessions.ReplayAdapter
+    )
+    requested.clear()
+    response = utils.get_response(session, base_url + 'pep-0008/')
+    assert (response.status_code, response.text) == (200, 'PEP 8')
+    assert requested == [], 'Воспроизведение не должно ходить в сеть'
+    response = session.head(base_url + 'docs.zip')
+    assert response.headers['Content-Length'] == '9'
+    with pytest.raises(ConnectionError):
+        utils.get_response(session, base_url + 'pep-0020/')
+
+
+def test_default_timeouts(monkeypatch):
+    sent = {}
+
+    def send(adapter, request, **kwargs):
+        sent.update(kwargs)
+
+    monkeypatch.setattr(HTTPAdapter, 'send', send)
+    adapter = sessions.TimeoutAdapter(sessions.Timeouts(3, 9))
+    adapter.send(None)
+    assert sent['timeout'] == (3, 9), (
+        'Запрос без срока ожидания должен получать сроки сессии'
+    )
+    adapter.send(None, timeout=1)
+    assert sent['timeout'] == 1
+
+
+@pytest.mark.parametrize('argv, modes, pool_size', [
+    (['pep'], 1, 8),
+    (['pep', 'whats-new', '-j', '-w', '4'], 2, 8),
+    (['pep', 'whats-new', '-w', '4'], 2, 4),
+    (['pep', '--pool-size', '3'], 1, 3),
+])
+def test_configure_session(argv, modes, pool_size):
+    args = configs.configure_argument_parser(
+        ['pep', 'whats-new']
+    ).parse_args(argv)
+    got = configs.configure_session(args, modes)
+    assert got['pool_size'] == pool_size
+    assert got['timeouts'] == (5, 30)
+
+
+def test_environment_defaults(monkeypatch):
+    monkeypatch.setenv('BS4_PARSER_READ_TIMEOUT', '90')
+    monkeypatch.setenv('BS4_PARSER_POOL_SIZE', '16')
+    parser = configs.configure_argument_parser(['pep'])
+    args = parser.parse_args(['pep'])
+    assert (args.read_timeout, args.pool_size) == (90, 16)
+    args = parser.parse_args(['pep', '--read-timeout', '10'])
+    assert args.read_timeout == 10, 'Аргумент должен быть важнее окружения'
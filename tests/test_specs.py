@@ -0,0 +1,93 @@
+import pytest
+from bs4 import BeautifulSoup
+from conftest import get_pep_pages, get_whats_new_pages
+from lxml.html import document_fromstring
+try:
+    from src import specs
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `specs.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `specs.py`'
+
+SIDEBAR_PAGE = '''<html><body><div class="sphinxsidebarwrapper">
+<ul><li><a href="#intro">Introduction</a></li></ul>
+<h3>Docs by version</h3><ul>
+<li><a href="https://docs.python.org/3.13/">Python 3.13 (pre-release)</a></li>
+<li><a href="https://docs.python.org/3.12/">Python 3.12 (stable)</a></li>
+<li><a href="https://www.python.org/doc/versions/">All versions</a></li>
+</ul></div>
+<a href="archives/python-3.12.0-docs-pdf-letter.zip">Letter</a>
+<a href="archives/python-3.12.0-docs-pdf-a4.zip">A4</a>
+</body></html>'''
+TREE_BUILDERS = {
+    'bs4': lambda text: BeautifulSoup(text, features='lxml'),
+    'lxml': document_fromstring,
+}
+
+
+@pytest.fixture(params=TREE_BUILDERS)
+def build_tree(request):
+    return TREE_BUILDERS[request.param]
+
+
+def test_pep_specs(build_tree):
+    pages = get_pep_pages()
+    rows = specs.PEP_INDEX.extract_all(build_tree(pages['']))
+    assert [row['number'] for row in rows] == ['1', '2', '8', '20', '736']
+    assert rows[3] == {
+        'number': '20', 'href': 'pep-0020/', 'preview_status': 'Accepted',
+    }
+    assert specs.PEP_CARD.extract(build_tree(pages['pep-0008/'])) == {
+        'status': 'Final',
+    }
+
+
+def test_whats_new_specs(build_tree):
+    pages = get_whats_new_pages()
+    links = specs.WHATS_NEW_INDEX.extract_all(build_tree(pages['']))
+    assert [link['href'] for link in links][:2] == ['3.12.html', '3.11.html']
+    version = specs.WHATS_NEW_VERSION.extract(build_tree(pages['3.12.html']))
+    assert version['title'].startswith('What’s New In Python 3.12')
+    assert 'Editor' in version['editors']
+
+
+def test_sidebar_specs(build_tree):
+    tree = build_tree(SIDEBAR_PAGE)
+    assert specs.LATEST_VERSIONS.extract_all(tree) == [
+        {
+            'href': 'https://docs.python.org/3.13/',
+            'version': '3.13',
+            'status': 'pre-release',
+        },
+        {
+            'href': 'https://docs.python.org/3.12/',
+            'version': '3.12',
+            'status': 'stable',
+        },
+        {
+            'href': 'https://www.python.org/doc/versions/',
+            'version': 'All versions',
+            'status': '',
+        },
+    ], 'Без совпадения с шаблоном текст ссылки должен попасть в версию'
+    assert specs.DOWNLOAD_ARCHIVE.extract(tree) == {
+        'href': 'archives/python-3.12.0-docs-pdf-a4.zip',
+    }
+
+
+def test_missing_field(build_tree):
+    with pytest.raises(specs.ParserFindTagException):
+        specs.PEP_CARD.extract(build_tree('<html><dl></dl></html>'))
+    with pytest.raises(specs.ParserFindTagException):
+        specs.PEP_INDEX.extract_all(build_tree('<html><p></p></html>'))
+
+
+def test_selectors_compile_once():
+    selector = specs.PEP_INDEX.records
+    tree = document_fromstring(get_pep_pages()[''])
+    specs.PEP_INDEX.extract_all(tree)
+    compiled = selector.compiled_xpath
+    specs.PEP_INDEX.extract_all(tree)
+    assert selector.compiled_xpath is compiled, (
+        'Выражения описания должны компилироваться один раз'
+    )
@@ -0,0 +1,63 @@
+import sqlite3
+import sys
+
+import pytest
+try:
+    from src import store
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `store.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `store.py`'
+
+HEADER = ('Ссылка на статью', 'Заголовок', 'Редактор, Автор')
+ROWS = [
+    ('https://docs.python.org/3/whatsnew/3.12.html', '3.12', b'Adam Turner'),
+    ('https://docs.python.org/3/whatsnew/2.0.html', '2.0', b'A.M. Kuchling'),
+]
+
+
+def test_store_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, 'STORE_BATCH_SIZE', 1)
+    path = tmp_path / 'store' / 'results.sqlite'
+    assert store.store_results(
+        iter([HEADER, *ROWS]), path, 'whats-new', 'run-1'
+    ) == 2
+    assert store.load_results(path, 'whats-new', 'run-1') == [
+        HEADER,
+        (ROWS[0][0], '3.12', 'Adam Turner'),
+        (ROWS[1][0], '2.0', 'A.M. Kuchling'),
+    ]
+    store.store_results(
+        [HEADER, (ROWS[0][0], '3.12', b'Thomas Wouters')],
+        path, 'whats-new', 'run-1'
+    )
+    store.store_results([HEADER, ROWS[1]], path, 'whats-new', 'run-2')
+    with sqlite3.connect(path) as connection:
+        history = connection.execute(
+            'SELECT run, row FROM results WHERE mode = ? AND key = ? '
+            'ORDER BY run', ('whats-new', ROWS[0][0])
+        ).fetchall()
+    expected = f'["{ROWS[0][0]}", "3.12", "Thomas Wouters"]'
+    assert history == [('run-1', expected)], (
+        'Повторная запись ключа в том же запуске должна заменять строку'
+    )
+    assert store.load_results(path, 'whats-new', 'run-3') == []
+    assert store.store_results(
+        [HEADER, ROWS[0], ROWS[0]], path, 'whats-new', 'run-4'
+    ) == 1, 'Число записанных строк не должно считать заменённые'
+
+
+def test_export_parquet(tmp_path):
+    pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+    path = tmp_path / 'whats-new' / 'run.parquet'
+    store.export_parquet(path, [HEADER, *ROWS])
+    table = pyarrow.parquet.read_table(path)
+    assert table.column_names == list(HEADER)
+    assert table.num_rows == 2
+
+
+def test_export_parquet_without_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    with pytest.raises(RuntimeError):
+        store.export_parquet(tmp_path / 'run.parquet', [HEADER, *ROWS])
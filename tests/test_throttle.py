@@ -0,0 +1,147 @@
+import asyncio
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+import requests
+import requests_mock
+from requests_cache import CachedSession
+try:
+    from src import metrics, throttle
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `throttle.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `throttle.py`'
+
+URL = 'https://example.com/page'
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = metrics.Metrics()
+    monkeypatch.setattr(throttle, 'registry', registry)
+    return registry
+
+
+@pytest.fixture
+def configured():
+    def _configured(**kwargs):
+        throttle.throttle.configure(**{'backoff': 0, **kwargs})
+        return throttle.throttle
+    yield _configured
+    throttle.throttle.configure()
+
+
+def throttled_session(responses):
+    adapter = requests_mock.Adapter()
+    adapter.register_uri('GET', URL, responses)
+    session = CachedSession(backend='memory')
+    session.mount('https://', throttle.ThrottledAdapter(adapter))
+    return session, adapter
+
+
+def test_retry_after_overload(registry, configured):
+    configured(retries=2)
+    session, adapter = throttled_session([
+        {'status_code': 503, 'headers': {'Retry-After': '0'}},
+        {'status_code': 429},
+        {'text': 'ok'},
+    ])
+    response = session.get(URL)
+    assert response.text == 'ok', (
+        'Ответы 429 и 503 должны повторяться до успешного'
+    )
+    assert adapter.call_count == 3
+    assert registry.counters['fetch_retries'] == 2
+    assert 'fetch_dropped' not in registry.counters
+    assert session.get(URL).from_cache, 'Удачный ответ должен попасть в кеш'
+    assert adapter.call_count == 3
+
+
+def test_dropped_after_retries(registry, configured):
+    configured(retries=1)
+    session, adapter = throttled_session([{'exc': requests.ConnectTimeout}])
+    with pytest.raises(requests.ConnectTimeout):
+        session.get(URL)
+    assert adapter.call_count == 2
+    assert registry.counters['fetch_retries'] == 1
+    assert registry.counters['fetch_dropped'] == 1
+
+
+def test_send_async(registry, configured):
+    configured(retries=3)
+    statuses = iter((502, 504, 200))
+
+    async def send():
+        return SimpleNamespace(status_code=next(statuses), headers={})
+
+    response = asyncio.run(
+        throttle.throttle.send_async(URL, send, (asyncio.TimeoutError,))
+    )
+    assert response.status_code == 200
+    assert registry.counters['fetch_retries'] == 2
+
+
+def test_adaptive_concurrency(registry):
+    limit = throttle.HostLimit(rate=None, concurrency=4)
+    assert [limit.try_enter() for _ in range(5)] == [True] * 4 + [False]
+    limit.leave(ok=False)
+    assert limit.limit == 2, 'После ошибки предел должен делиться пополам'
+    assert not limit.try_enter()
+    for _ in range(3):
+        limit.leave(ok=True)
+    assert 2 < limit.limit < 4, 'Удачные ответы должны поднимать предел'
+    for _ in range(20):
+        limit.enter()
+        limit.leave(ok=True)
+    assert limit.limit == 4
+    assert registry.counters['throttle_backoffs'] == 1
+
+
+def test_enter_async_waits_without_polling(registry):
+    limit = throttle.HostLimit(rate=None, concurrency=2)
+    running = []
+
+    async def fetch(number):
+        await limit.enter_async()
+        running.append(number)
+        assert limit.active <= 2
+        await asyncio.sleep(0)
+        limit.leave(ok=True)
+        return number
+
+    async def fetch_all():
+        limit.active = 2
+        waiting = [asyncio.ensure_future(fetch(number)) for number in range(6)]
+        await asyncio.sleep(0)
+        waiting[0].cancel()
+        assert len(limit.waiters) == 6, (
+            'Ожидающие корутины должны ждать, а не опрашивать предел'
+        )
+        for _ in range(2):
+            limit.leave(ok=True)
+        return await asyncio.gather(*waiting[1:])
+
+    assert asyncio.run(fetch_all()) == [1, 2, 3, 4, 5]
+    assert running == [1, 2, 3, 4, 5], 'Места должны выдаваться по очереди'
+    assert (limit.active, limit.waiters) == (0, deque()), (
+        'Место отменённой корутины должно перейти следующей'
+    )
+
+
+def test_token_bucket():
+    limit = throttle.HostLimit(rate=10, concurrency=2)
+    delays = [limit.reserve() for _ in range(4)]
+    assert delays[:2] == [0, 0], 'Первые запросы идут без ожидания'
+    assert delays[2] == pytest.approx(0.1, abs=0.01)
+    assert delays[3] == pytest.approx(0.2, abs=0.01)
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('3', 3.0),
+    ('Wed, 21 Oct 2015 07:28:00 GMT', 0.0),
+    ('soon', None),
+])
+def test_retry_after(value, expected):
+    response = SimpleNamespace(headers={'Retry-After': value})
+    assert throttle.retry_after(response) == expected
@@ -2,7 +2,8 @@ import pytest
 import requests
 import requests_mock
 import bs4
-from conftest import MAIN_DOC_URL
+from requests_cache import CachedSession
+from conftest import MAIN_DOC_URL, get_pep_pages
 try:
     from src import utils
 except ModuleNotFoundError:
@@ -54,3 +55,36 @@ def test_get_response(mock_session):
             'делает запрос к странице и возвращает ответ. \n'
             'Кстати: You are breathtaken!'
         )
+
+
+def test_get_response_revalidates(local_server):
+    base_url, requested = local_server(get_pep_pages())
+    session = CachedSession(
+        backend='memory',
+        expire_after=0,
+        urls_expire_after={base_url.split('://')[1] + 'pep-*': -1},
+    )
+    first = utils.get_response(session, base_url)
+    second = utils.get_response(session, base_url)
+    utils.get_response(session, base_url + 'pep-0001/')
+    utils.get_response(session, base_url + 'pep-0001/')
+    assert not first.from_cache and second.from_cache
+    assert second.text == first.text, (
+        'Ответ 304 должен отдавать тело страницы из кеша'
+    )
+    assert requested == ['', '', 'pep-0001/'], (
+        'Устаревшая страница должна перепроверяться, '
+        'а бессрочная - браться из кеша'
+    )
+
+
+def test_make_tree(pep_session):
+    tree = utils.make_tree(pep_session, 'https://peps.python.org/pep-0001/')
+    assert tree.xpath('//dt'), 'Ожидалось дерево lxml всей страницы'
+
+
+@pytest.mark.parametrize('text', ['', ' \n'])
+def test_parse_tree_empty(text):
+    assert utils.parse_tree(text).xpath('//dt') == [], (
+        'Пустая страница должна давать пустое дерево, а не ошибку'
+    )
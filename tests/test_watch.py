@@ -0,0 +1,70 @@
+from argparse import Namespace
+import os
+import signal
+
+try:
+    from src import watch
+except ModuleNotFoundError:
+    assert False, 'Убедитесь что в директории `src` есть файл `watch.py`'
+except ImportError:
+    assert False, 'Убедитесь что в директории `src` есть файл `watch.py`'
+
+HEADER = ('Статус', 'Количество')
+
+
+def test_changed_rows():
+    changed, seen = watch.changed_rows(
+        set(), [HEADER, ('Active', 1), ('Total', 1)]
+    )
+    assert changed == [HEADER, ('Active', 1), ('Total', 1)], (
+        'Первый опрос должен выводить все строки'
+    )
+    changed, seen = watch.changed_rows(
+        seen, [HEADER, ['Active', 1], ('Draft', 1), ('Total', 2)]
+    )
+    assert changed == [HEADER, ('Draft', 1), ('Total', 2)]
+    assert watch.changed_rows(seen, [HEADER, *seen]) == (None, seen)
+
+
+def test_watcher_until_sigterm(monkeypatch):
+    monkeypatch.setattr(watch, 'WATCH_TICK', 0.01)
+    polls = []
+    emitted = []
+    tables = {
+        'pep': [[HEADER, ('Active', 1)], [HEADER, ('Active', 1)],
+                [HEADER, ('Active', 2)]],
+        'whats-new': [[('Ссылка',), ('3.12',)]] * 10,
+    }
+
+    def poll(mode_args):
+        polls.append(mode_args.mode)
+        if polls.count('pep') == 3:
+            os.kill(os.getpid(), signal.SIGTERM)
+        if mode_args.mode == 'download':
+            raise ConnectionError('нет сети')
+        return tables[mode_args.mode][polls.count(mode_args.mode) - 1]
+
+    handler = signal.getsignal(signal.SIGTERM)
+    watcher = watch.Watcher(
+        [
+            (Namespace(mode='pep'), 0.02),
+            (Namespace(mode='whats-new'), 10),
+            (Namespace(mode='download'), 0.05),
+        ],
+        poll,
+        lambda rows, mode_args: emitted.append((mode_args.mode, rows))
+    )
+    watcher.run()
+    assert watcher.stopped == 'SIGTERM'
+    assert polls.count('pep') == 3, 'После сигнала опросов быть не должно'
+    assert polls.count('whats-new') == 1, (
+        'Каждый режим опрашивается со своим интервалом'
+    )
+    assert emitted == [
+        ('pep', [HEADER, ('Active', 1)]),
+        ('whats-new', [('Ссылка',), ('3.12',)]),
+        ('pep', [HEADER, ('Active', 2)]),
+    ], 'Должны выводиться только изменившиеся строки'
+    assert signal.getsignal(signal.SIGTERM) is handler, (
+        'После остановки нужно вернуть прежний обработчик сигнала'
+    )